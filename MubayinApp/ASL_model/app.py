@@ -1,24 +1,63 @@
 import os
+import sys
+import time
+import threading
 import cv2
-import shutil
 import numpy as np
-from flask import Flask, jsonify
-from tensorflow.keras.models import load_model
-import mediapipe as mp
+from flask import Flask, Response, request, jsonify
+
+# === Code shared with HandModel-backend lives one level up ===
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sign_common.keypoints import FEATURES, new_buffer, extract_keypoints
+from sign_common.detector_pool import DetectorPool, PoolTimeout
+from sign_common.detectors import mediapipe
+from sign_common.overlay import OverlayWriter
+from sign_common.keypoint_cache import KeypointCache
+from sign_common.serving import PREFORK
+from sign_common import metrics
+
+from streaming import SessionStore
+from batching import BatchScheduler
+from inference import INFERENCE_BACKEND, load_engine, fork_safe
+from pipeline import FramePipeline, PipelineBusy, DecodeError
 
 # === Initialize Flask app ===
 app = Flask(__name__)
 
-# === Load trained LSTM model ===
-model = load_model("model/final_hands_asl_lstm_best_model.h5")
+# === Fast start (ASL_FAST_START=1) ===
+# The server starts answering at once and loads the model and detectors on a
+# background thread; requests get 503 until GET /ready reports ready. Unless
+# INFERENCE_BACKEND says otherwise it uses the NumPy engine on the exported
+# model/*.npz, so TensorFlow is never imported.
+FAST_START = os.environ.get('ASL_FAST_START', '0') == '1'
+ENGINE_BACKEND = 'numpy' if FAST_START and 'INFERENCE_BACKEND' not in os.environ else INFERENCE_BACKEND
+
+# === Load trained LSTM model (backend picked by INFERENCE_BACKEND) ===
+# Under gunicorn only a fork-safe backend is loaded here, before the workers
+# fork; the others are loaded by each worker in warm_up_worker()
+if FAST_START or (PREFORK and not fork_safe(ENGINE_BACKEND)):
+    engine = None
+else:
+    engine = load_engine(ENGINE_BACKEND)
 actions = np.array([
     'hello', 'thank_you', 'yes', 'no', 'please',
     'help', 'sorry', 'nice_to_meet_you', 'how_are_you', 'Excuse_Me'
 ])
 
-# === MediaPipe Holistic setup ===
-mp_holistic = mp.solutions.holistic
-mp_drawing = mp.solutions.drawing_utils
+# === Warmed landmark detectors shared by all requests (LANDMARK_DETECTOR) ===
+detector_pool = DetectorPool(
+    lazy=PREFORK or FAST_START,
+    static_image_mode=True,
+    model_complexity=1,
+    enable_segmentation=False,
+    refine_face_landmarks=False
+)
+
+# === Landmark overlays, off the request path and off by default ===
+overlay_writer = OverlayWriter()
+
+# === Keypoints of frames seen before, keyed by a hash of the encoded bytes ===
+keypoint_cache = KeypointCache(namespace=f"asl-{detector_pool.backend}")
 
 # === MediaPipe detection function ===
 def mediapipe_detection(image, model):
@@ -26,22 +65,107 @@ def mediapipe_detection(image, model):
     results = model.process(image)
     return results
 
-# === Only extract hand keypoints (126 total: 63 for each hand) ===
-def extract_keypoints(results):
-    lh = np.array([[res.x, res.y, res.z]
-                   for res in results.left_hand_landmarks.landmark]).flatten() if results.left_hand_landmarks else np.zeros(63)
-    rh = np.array([[res.x, res.y, res.z]
-                   for res in results.right_hand_landmarks.landmark]).flatten() if results.right_hand_landmarks else np.zeros(63)
-    return np.concatenate([lh, rh])
+# === Number of frames the LSTM expects per sequence ===
+SEQUENCE_LENGTH = 5
+
+# === Concurrent requests share one (B, 5, 126) model call ===
+def run_model(batch):
+    with metrics.stage_seconds.time(stage='model'):
+        return engine.predict(batch)
+
+batch_scheduler = BatchScheduler(run_model)
+
+# === Turn the model's class probabilities into (label, confidence) ===
+def label_prediction(prediction):
+    predicted_label = actions[np.argmax(prediction)].replace('-', ' ')
+    confidence = float(np.max(prediction))
+    metrics.prediction_confidence.observe(confidence)
+    return predicted_label, confidence
+
+# === Run the LSTM on a (5, 126) keypoint sequence ===
+def classify_sequence(sequence):
+    return label_prediction(batch_scheduler.predict(sequence))
+
+# === Frames of all requests go through one staged pipeline ===
+# decode -> color/resize -> landmarks -> keypoint pack -> classify, with a
+# bounded queue in front of each stage (timings at GET /pipeline)
+frame_pipeline = FramePipeline(detector_pool, keypoint_cache, overlay_writer, classify_sequence)
+
+# === Warm-up and readiness (GET /ready) ===
+# Loads whatever is not loaded yet, runs a dummy (1, 5, 126) input through the
+# model and a blank frame through every detector graph, then pushes one
+# sequence through the batch scheduler, so the first real request pays for
+# none of it. Runs at import, on a background thread under FAST_START, or per
+# worker from gunicorn.conf.py.
+ready = threading.Event()
+warm_up_seconds = None
+
+def warm_up_worker():
+    global engine, warm_up_seconds
+    started = time.perf_counter()
+    try:
+        # MediaPipe first: under FAST_START a request thread may be importing
+        # it with its TensorFlow stand-ins while this one loads the model
+        mediapipe()
+        if engine is None:
+            engine = load_engine(ENGINE_BACKEND)
+        engine.predict(np.zeros((1, SEQUENCE_LENGTH, FEATURES), dtype=np.float32))
+        detector_pool.warm()  # each graph processes a blank frame as it is built
+        classify_sequence(new_buffer(SEQUENCE_LENGTH))
+    except Exception as e:
+        print("Error warming up:", e)
+        raise
+    warm_up_seconds = time.perf_counter() - started
+    ready.set()
+
+def readiness_state():
+    if not ready.is_set():
+        return {'ready': False}
+    return {'ready': True, 'backend': engine.name, 'precision': getattr(engine, 'precision', 'float32'),
+            'warm_up_s': warm_up_seconds}
+
+if FAST_START:
+    threading.Thread(target=warm_up_worker, name='warm-up', daemon=True).start()
+elif not PREFORK:
+    warm_up_worker()
+
+# === Decode an uploaded JPEG/PNG straight from memory ===
+def decode_frame(data):
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+# === Keypoints for one encoded frame, written into `out` ===
+# Resent frames come from the cache without decoding or running MediaPipe.
+# Returns False if the frame cannot be decoded.
+def frame_keypoints(data, detector, out, overlay_path=None):
+    key = keypoint_cache.key(data)
+    if keypoint_cache.get(key, out) is not None:
+        return True
+
+    with metrics.stage_seconds.time(stage='decode'):
+        image = decode_frame(data)
+    if image is None:
+        return False
+    with metrics.stage_seconds.time(stage='mediapipe_detection'):
+        results = mediapipe_detection(image, detector)
+    with metrics.stage_seconds.time(stage='extract_keypoints'):
+        extract_keypoints(results, out)
+    metrics.record_frame(out)
+    keypoint_cache.put(key, out)
+
+    # === Debug overlay with the hands drawn (OVERLAY_ENABLED) ===
+    if overlay_path:
+        overlay_writer.submit(image, results, overlay_path)
+    return True
 
 # === Prediction route ===
 @app.route('/predict', methods=['POST'])
 def predict():
     frame_dir = 'frames'
     processed_dir = os.path.join(frame_dir, 'processed_frames')
-    os.makedirs(processed_dir, exist_ok=True)
-
-    sequence = []
+    os.makedirs(frame_dir, exist_ok=True)
 
     try:
         # Step 1: Get sorted image list
@@ -50,59 +174,153 @@ def predict():
             if f.lower().endswith('.jpg') or f.lower().endswith('.png')
         ], key=lambda x: os.path.getmtime(os.path.join(frame_dir, x)))
 
-        if len(image_files) < 5:
+        if len(image_files) < SEQUENCE_LENGTH:
             return jsonify({'error': "Not enough frames (need at least 5)"}), 400
 
-        selected_images = image_files[:5]
+        selected_images = image_files[:SEQUENCE_LENGTH]
+        blobs = []
+        with metrics.stage_seconds.time(stage='file_io'):
+            for img_file in selected_images:
+                with open(os.path.join(frame_dir, img_file), 'rb') as f:
+                    blobs.append(f.read())
+        # Overlays for every frame of a sampled request, or none
+        overlay_paths = None
+        if overlay_writer.sample(len(selected_images)):
+            overlay_paths = [os.path.join(processed_dir, f"processed_{img_file}") for img_file in selected_images]
+
+        # Step 2: Keypoints and prediction through the frame pipeline
+        job = frame_pipeline.run(blobs, overlay_paths)
+
+        # Optionally delete originals
+        with metrics.stage_seconds.time(stage='file_io'):
+            for img_file in selected_images:
+                os.remove(os.path.join(frame_dir, img_file))
 
-        with mp_holistic.Holistic(
-            static_image_mode=True,
-            model_complexity=1,
-            enable_segmentation=False,
-            refine_face_landmarks=False
-        ) as holistic:
+        predicted_label, confidence = job.prediction
 
-            for img_file in selected_images:
-                img_path = os.path.join(frame_dir, img_file)
-                image = cv2.imread(img_path)
-                if image is None:
-                    return jsonify({'error': f"Failed to load image {img_file}"}), 400
-
-                results = mediapipe_detection(image, holistic)
-                keypoints = extract_keypoints(results)
-                sequence.append(keypoints)
-
-                # === Draw only hands for visualization ===
-                if results.left_hand_landmarks:
-                    mp_drawing.draw_landmarks(image, results.left_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
-                if results.right_hand_landmarks:
-                    mp_drawing.draw_landmarks(image, results.right_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
-
-                # === Save image with landmarks ===
-                processed_path = os.path.join(processed_dir, f"processed_{img_file}")
-                cv2.imwrite(processed_path, image)
-
-                # Optionally delete original
-                os.remove(img_path)
-
-        # Step 2: Prepare input for model
-        sequence = np.array(sequence)  # shape: (5, 126)
-        sequence = np.expand_dims(sequence, axis=0)  # shape: (1, 5, 126)
-
-        # Step 3: Predict
-        prediction = model.predict(sequence)[0]
-        # predicted_label = actions[np.argmax(prediction)]
-        predicted_label = actions[np.argmax(prediction)].replace('-', ' ')
-        confidence = float(np.max(prediction))
+        return jsonify({
+            'prediction': predicted_label,
+            'confidence': confidence
+        })
+
+    except DecodeError as e:
+        return jsonify({'error': f"Failed to load image {selected_images[e.index]}"}), 400
+    except (PoolTimeout, PipelineBusy) as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# === In-memory prediction route ===
+# The client posts the whole sequence as one multipart request with the frames
+# in order under the 'frames' field. Nothing is written to disk, so concurrent
+# clients can no longer pick up each other's frames.
+@app.route('/predict/frames', methods=['POST'])
+def predict_frames():
+    uploads = request.files.getlist('frames')
+    if len(uploads) < SEQUENCE_LENGTH:
+        return jsonify({'error': "Not enough frames (need at least 5)"}), 400
 
+    uploads = uploads[:SEQUENCE_LENGTH]
+
+    try:
+        job = frame_pipeline.run([upload.read() for upload in uploads])
+        predicted_label, confidence = job.prediction
+
+        return jsonify({
+            'prediction': predicted_label,
+            'confidence': confidence
+        })
+
+    except DecodeError as e:
+        return jsonify({'error': f"Failed to decode image {uploads[e.index].filename}"}), 400
+    except (PoolTimeout, PipelineBusy) as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# === Streaming sessions: one frame per request, sliding 5-frame window ===
+# Each frame is its own HTTP POST. asgi_app.py also serves the same sessions
+# over a WebSocket (/stream/<session_id>/ws), one message per frame.
+stream_sessions = SessionStore(window=SEQUENCE_LENGTH, features=FEATURES)
+
+@app.route('/stream/<session_id>', methods=['POST'])
+def stream_frame(session_id):
+    # Accept either a multipart 'frame' field or the raw image as the body
+    upload = request.files.get('frame')
+    data = upload.read() if upload else request.get_data()
+
+    try:
+        job = frame_pipeline.run([data], classify=False)
+        frames, window = stream_sessions.get(session_id).push(job.sequence[0])
+        if window is None:
+            return jsonify({'frames': frames, 'status': 'buffering'})
+
+        predicted_label, confidence = classify_sequence(window)
         return jsonify({
+            'frames': frames,
             'prediction': predicted_label,
             'confidence': confidence
         })
 
+    except DecodeError:
+        return jsonify({'error': 'Failed to decode frame'}), 400
+    except (PoolTimeout, PipelineBusy) as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/stream/<session_id>', methods=['DELETE'])
+def stream_close(session_id):
+    if not stream_sessions.close(session_id):
+        return jsonify({'error': 'Unknown session'}), 404
+    return jsonify({'message': 'Session closed'})
+
+@app.route('/stream', methods=['GET'])
+def stream_stats():
+    return jsonify(stream_sessions.stats())
+
+# === Batch size distribution and queueing delay ===
+@app.route('/batching', methods=['GET'])
+def batching_stats():
+    return jsonify(batch_scheduler.stats())
+
+# === Keypoint cache hit/miss counters ===
+@app.route('/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(keypoint_cache.stats())
+
+# === Readiness probe; other routes answer 503 until warm-up has finished ===
+@app.route('/ready', methods=['GET'])
+def readiness():
+    state = readiness_state()
+    return jsonify(state), 200 if state['ready'] else 503
+
+@app.before_request
+def wait_for_warm_up():
+    if not ready.is_set() and request.endpoint not in ('readiness', 'metrics_endpoint'):
+        return jsonify({'error': 'Warming up, retry shortly'}), 503
+
+# === Prometheus metrics (names shared with HandModel-backend) ===
+@app.after_request
+def count_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.record_request(route, response.status_code)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+# === Per-stage timing of the frame pipeline ===
+@app.route('/pipeline', methods=['GET'])
+def pipeline_stats():
+    return jsonify(frame_pipeline.stats())
+
+# === Pool occupancy and wait time ===
+@app.route('/pool', methods=['GET'])
+def pool_stats():
+    return jsonify(detector_pool.stats())
+
 # === Run server ===
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
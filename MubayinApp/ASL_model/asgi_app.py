@@ -0,0 +1,308 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Match, Route, WebSocketRoute
+from starlette.websockets import WebSocketDisconnect
+
+# === Same model, detectors, cache and sessions as the Flask app ===
+# Only the request handling differs: parsing and socket I/O stay on the event
+# loop, MediaPipe runs on a bounded thread pool and sequences are handed to
+# the batch scheduler without tying up a thread while they wait.
+from app import (
+    SEQUENCE_LENGTH, PoolTimeout, new_buffer, frame_keypoints, label_prediction,
+    detector_pool, batch_scheduler, keypoint_cache, overlay_writer, stream_sessions, metrics, ready, readiness_state
+)
+
+# === Backpressure configuration ===
+# Requests admitted at once (waiting for or running MediaPipe and the model);
+# further ones get 429 straight away
+MAX_INFLIGHT = int(os.environ.get('ASGI_MAX_INFLIGHT', detector_pool.size * 8))
+# Sequences queued for the model before new ones get 503
+MAX_MODEL_QUEUE = int(os.environ.get('ASGI_MAX_MODEL_QUEUE', 256))
+# Seconds clients are told to wait before retrying a 429/503
+RETRY_AFTER = os.environ.get('ASGI_RETRY_AFTER', '1')
+
+# One thread per detector graph, so a checkout never waits on another request
+landmark_executor = ThreadPoolExecutor(max_workers=detector_pool.size, thread_name_prefix='landmarks')
+
+
+class ModelBusy(Exception):
+    pass
+
+
+# === Count of requests past admission; only touched from the event loop ===
+class Admission:
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def admit(self):
+        if self.active >= self.limit:
+            self.rejected += 1
+            return False
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+
+    def stats(self):
+        return {
+            'limit': self.limit,
+            'active': self.active,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'model_queue': batch_scheduler.pending,
+            'max_model_queue': MAX_MODEL_QUEUE,
+        }
+
+
+admission = Admission(MAX_INFLIGHT)
+
+
+def busy(message, status):
+    return JSONResponse({'error': message}, status_code=status, headers={'Retry-After': RETRY_AFTER})
+
+
+# === Stage 1: keypoints for each frame, on a landmark thread ===
+# Returns the keypoints and the index of the first frame that failed to
+# decode, or None if they all decoded.
+def sequence_keypoints(blobs):
+    sequence = new_buffer(len(blobs))
+    with detector_pool.checkout() as detector:
+        for i, data in enumerate(blobs):
+            if not frame_keypoints(data, detector, sequence[i]):
+                return sequence, i
+    return sequence, None
+
+
+# === Legacy /predict: the same frames/ directory contract as the Flask route ===
+def frame_dir_keypoints(frame_dir='frames'):
+    processed_dir = os.path.join(frame_dir, 'processed_frames')
+    os.makedirs(frame_dir, exist_ok=True)
+    image_files = sorted([
+        f for f in os.listdir(frame_dir)
+        if f.lower().endswith('.jpg') or f.lower().endswith('.png')
+    ], key=lambda x: os.path.getmtime(os.path.join(frame_dir, x)))
+
+    if len(image_files) < SEQUENCE_LENGTH:
+        return None, "Not enough frames (need at least 5)"
+
+    sequence = new_buffer(SEQUENCE_LENGTH)
+    # Overlays for every frame of a sampled request, or none
+    overlays = overlay_writer.sample(SEQUENCE_LENGTH)
+    with detector_pool.checkout() as detector:
+        for i, img_file in enumerate(image_files[:SEQUENCE_LENGTH]):
+            img_path = os.path.join(frame_dir, img_file)
+            with open(img_path, 'rb') as f:
+                data = f.read()
+            overlay_path = os.path.join(processed_dir, f"processed_{img_file}") if overlays else None
+            if not frame_keypoints(data, detector, sequence[i], overlay_path):
+                return None, f"Failed to load image {img_file}"
+            os.remove(img_path)
+    return sequence, None
+
+
+async def in_landmark_executor(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(landmark_executor, fn, *args)
+
+
+# === Stage 2: the LSTM, through the batch scheduler ===
+async def classify(sequence):
+    if batch_scheduler.pending >= MAX_MODEL_QUEUE:
+        raise ModelBusy("Model queue is full, retry later")
+    prediction = await asyncio.wrap_future(batch_scheduler.submit(sequence))
+    return label_prediction(prediction)
+
+
+async def admitted(handler):
+    if not ready.is_set():
+        return busy("Warming up, retry shortly", 503)
+    if not admission.admit():
+        return busy("Too many requests in flight, retry later", 429)
+    try:
+        return await handler()
+    except (PoolTimeout, ModelBusy) as e:
+        return busy(str(e), 503)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+    finally:
+        admission.release()
+
+
+def prediction_response(predicted_label, confidence, **extra):
+    return JSONResponse({**extra, 'prediction': predicted_label, 'confidence': confidence})
+
+
+# === Routes (same paths and payloads as app.py) ===
+async def predict(request):
+    async def run():
+        sequence, error = await in_landmark_executor(frame_dir_keypoints)
+        if error:
+            return JSONResponse({'error': error}, status_code=400)
+        return prediction_response(*await classify(sequence))
+
+    return await admitted(run)
+
+
+# Uploads are parsed inside admitted(), so a rejected request is never buffered
+async def predict_frames(request):
+    async def run():
+        async with request.form() as form:
+            # Plain text fields are ignored, as Flask's request.files does
+            uploads = [upload for upload in form.getlist('frames') if isinstance(upload, UploadFile)]
+            if len(uploads) < SEQUENCE_LENGTH:
+                return JSONResponse({'error': "Not enough frames (need at least 5)"}, status_code=400)
+            uploads = uploads[:SEQUENCE_LENGTH]
+            blobs = [await upload.read() for upload in uploads]
+
+        sequence, failed = await in_landmark_executor(sequence_keypoints, blobs)
+        if failed is not None:
+            return JSONResponse({'error': f"Failed to decode image {uploads[failed].filename}"}, status_code=400)
+        return prediction_response(*await classify(sequence))
+
+    return await admitted(run)
+
+
+async def stream_frame(request):
+    session_id = request.path_params['session_id']
+
+    async def run():
+        # Accept either a multipart 'frame' file or the raw image as the body
+        if request.headers.get('content-type', '').startswith('multipart/form-data'):
+            async with request.form() as form:
+                upload = form.get('frame')
+                data = await upload.read() if isinstance(upload, UploadFile) else b''
+        else:
+            data = await request.body()
+
+        keypoints, failed = await in_landmark_executor(sequence_keypoints, [data])
+        if failed is not None:
+            return JSONResponse({'error': 'Failed to decode frame'}, status_code=400)
+
+        frames, window = stream_sessions.get(session_id).push(keypoints[0])
+        if window is None:
+            return JSONResponse({'frames': frames, 'status': 'buffering'})
+        return prediction_response(*await classify(window), frames=frames)
+
+    return await admitted(run)
+
+
+# === WebSocket stream: one open connection per call, one binary message per frame ===
+# Each frame costs a WebSocket message instead of an HTTP request and a
+# multipart parse. The session is the same one POST /stream/<id> uses, so a
+# client that reconnects keeps its window until STREAM_IDLE_TIMEOUT. Every
+# frame gets a JSON reply in the POST route's format.
+async def stream_socket(websocket):
+    if not ready.is_set():
+        await websocket.close(code=1013)  # try again later
+        return
+    await websocket.accept()
+    session_id = websocket.path_params['session_id']
+    try:
+        while True:
+            data = await websocket.receive_bytes()
+            await websocket.send_json(await stream_socket_frame(session_id, data))
+    except WebSocketDisconnect:
+        pass
+
+
+async def stream_socket_frame(session_id, data):
+    if not admission.admit():
+        return {'error': "Too many requests in flight, retry later"}
+    try:
+        keypoints, failed = await in_landmark_executor(sequence_keypoints, [data])
+        if failed is not None:
+            return {'error': 'Failed to decode frame'}
+        frames, window = stream_sessions.get(session_id).push(keypoints[0])
+        if window is None:
+            return {'frames': frames, 'status': 'buffering'}
+        predicted_label, confidence = await classify(window)
+        return {'frames': frames, 'prediction': predicted_label, 'confidence': confidence}
+    except Exception as e:
+        return {'error': str(e)}
+    finally:
+        admission.release()
+
+
+async def stream_close(request):
+    if not stream_sessions.close(request.path_params['session_id']):
+        return JSONResponse({'error': 'Unknown session'}, status_code=404)
+    return JSONResponse({'message': 'Session closed'})
+
+
+async def stream_stats(request):
+    return JSONResponse(stream_sessions.stats())
+
+
+async def batching_stats(request):
+    return JSONResponse(batch_scheduler.stats())
+
+
+async def cache_stats(request):
+    return JSONResponse(keypoint_cache.stats())
+
+
+async def pool_stats(request):
+    return JSONResponse(detector_pool.stats())
+
+
+async def admission_stats(request):
+    return JSONResponse(admission.stats())
+
+
+async def readiness(request):
+    state = readiness_state()
+    return JSONResponse(state, status_code=200 if state['ready'] else 503)
+
+
+async def metrics_endpoint(request):
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+async def count_request(request, call_next):
+    response = await call_next(request)
+    # Label by route template so session ids do not each get a series
+    route = next((r.path for r in routes if r.matches(request.scope)[0] == Match.FULL), 'unmatched')
+    metrics.record_request(route, response.status_code)
+    return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    landmark_executor.shutdown(wait=False, cancel_futures=True)
+
+
+routes = [
+    Route('/predict', predict, methods=['POST']),
+    Route('/predict/frames', predict_frames, methods=['POST']),
+    Route('/stream/{session_id}', stream_frame, methods=['POST']),
+    WebSocketRoute('/stream/{session_id}/ws', stream_socket),
+    Route('/stream/{session_id}', stream_close, methods=['DELETE']),
+    Route('/stream', stream_stats, methods=['GET']),
+    Route('/batching', batching_stats, methods=['GET']),
+    Route('/cache', cache_stats, methods=['GET']),
+    Route('/pool', pool_stats, methods=['GET']),
+    Route('/admission', admission_stats, methods=['GET']),
+    Route('/ready', readiness, methods=['GET']),
+    Route('/metrics', metrics_endpoint, methods=['GET']),
+]
+
+app = Starlette(routes=routes, lifespan=lifespan,
+                middleware=[Middleware(BaseHTTPMiddleware, dispatch=count_request)])
+
+# === Run server: python asgi_app.py, or uvicorn asgi_app:app --port 5000 ===
+if __name__ == '__main__':
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,103 @@
+"""Batches of training sequences, augmented on the fly with fresh noise each epoch.
+
+Each batch is gathered from the training set (an array or a dataset.py
+memmap) and augmented in place as float32, so only the batches in flight
+are ever copied. Augmentations, applied per sequence:
+    hand swap      mirror x and swap the left/right hand blocks
+    scaling        scale x/y about the frame centre (and z) by 1 +/- scale
+    jitter         Gaussian noise on the landmarks of detected hands (on every
+                   value with jitter_missing, as the original trainer added it)
+    frame dropout  zero whole frames, as when MediaPipe misses the hands
+Keras prefetches batches on PREFETCH_WORKERS threads (pass the fit_kwargs()
+to model.fit), so augmentation overlaps with training.
+"""
+import math
+import os
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+# === Keypoint layout shared with the servers lives one level up ===
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sign_common.keypoints import HAND_LANDMARKS
+
+PREFETCH_WORKERS = int(os.environ.get('AUGMENT_PREFETCH_WORKERS', 2))
+PREFETCH_BATCHES = int(os.environ.get('AUGMENT_PREFETCH_BATCHES', 16))
+
+JITTER = 0.01
+FRAME_DROPOUT = 0.1
+HAND_SWAP = 0.2
+SCALE = 0.1
+
+
+# === Vectorized augmentations over a (batch, frames, 126) float32 array ===
+def augment_batch(batch, rng, jitter=JITTER, frame_dropout=FRAME_DROPOUT, hand_swap=HAND_SWAP, scale=SCALE,
+                  jitter_missing=False):
+    size, frames, _ = batch.shape
+    # (batch, frames, hand, landmark, xyz) view; writes go straight to batch
+    hands = batch.reshape(size, frames, 2, HAND_LANDMARKS, 3)
+    # A missing hand is all zeros and has to stay that way
+    present = hands.any(axis=(3, 4), keepdims=True)
+
+    if hand_swap:
+        swap = rng.random(size) < hand_swap
+        if swap.any():
+            hands[swap] = hands[swap][:, :, ::-1]
+            present[swap] = present[swap][:, :, ::-1]
+            hands[swap, ..., 0] = 1.0 - hands[swap, ..., 0]
+
+    if scale:
+        factor = rng.uniform(1.0 - scale, 1.0 + scale, size=(size, 1, 1, 1, 1)).astype(np.float32)
+        hands[..., :2] -= 0.5
+        hands *= factor
+        hands[..., :2] += 0.5
+
+    hands *= present
+
+    if jitter:
+        noise = rng.normal(0.0, jitter, size=hands.shape).astype(np.float32)
+        hands += noise if jitter_missing else noise * present
+
+    if frame_dropout:
+        drop = rng.random((size, frames)) < frame_dropout
+        drop[drop.all(axis=1), 0] = False  # always keep at least one frame
+        batch[drop] = 0.0
+    return batch
+
+
+# === Keras Sequence: shuffled, augmented batches from an index subset ===
+class AugmentedSequence(tf.keras.utils.Sequence):
+    def __init__(self, X, y, indices=None, batch_size=16, seed=0, **augment):
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.indices = np.arange(len(X)) if indices is None else np.asarray(indices)
+        self.batch_size = batch_size
+        self.seed = seed
+        self.augment = augment
+        self.epoch = 0
+        self._order = self._shuffled()
+
+    def _shuffled(self):
+        return np.random.default_rng([self.seed, self.epoch]).permutation(self.indices)
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, index):
+        # Sorted so a memmap is read front to back; the batch order does not matter
+        rows = np.sort(self._order[index * self.batch_size:(index + 1) * self.batch_size])
+        batch = np.array(self.X[rows], dtype=np.float32)
+        # Seeded per (epoch, batch): reproducible, and safe across prefetch threads
+        rng = np.random.default_rng([self.seed, self.epoch, index])
+        return augment_batch(batch, rng, **self.augment), np.asarray(self.y[rows])
+
+    def on_epoch_end(self):
+        self.epoch += 1
+        self._order = self._shuffled()
+
+
+def fit_kwargs(workers=PREFETCH_WORKERS, batches=PREFETCH_BATCHES):
+    # Keras keeps up to `batches` ready on `workers` threads while it trains
+    return {'workers': workers, 'max_queue_size': batches, 'use_multiprocessing': False}
@@ -0,0 +1,104 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# === Batching configuration ===
+# Largest number of sequences run through the model in one call
+MAX_BATCH_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 32))
+# How long the first queued sequence may wait for others to join its batch
+MAX_DELAY_MS = float(os.environ.get('BATCH_MAX_DELAY_MS', 2))
+
+
+# === Dynamic micro-batching in front of the LSTM ===
+# Requests submit single (5, 126) sequences; a background thread gathers
+# whatever is pending, runs one (B, 5, 126) call and hands each request its row.
+class BatchScheduler:
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_delay_ms=MAX_DELAY_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_delay = max_delay_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_delays = deque(maxlen=4096)
+        self._batches = 0
+        self._sequences = 0
+        self._worker_pid = None
+
+    def _ensure_worker(self):
+        # Started on first use, and again in a forked child, which inherits
+        # the scheduler object but not its thread
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, args=(self._queue,), name='batch-scheduler', daemon=True).start()
+                self._worker_pid = os.getpid()
+
+    def submit(self, sequence):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(sequence, dtype=np.float32), time.perf_counter(), future))
+        return future
+
+    def predict(self, sequence):
+        return self.submit(sequence).result()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _collect(self, pending):
+        batch = [pending.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending):
+        while True:
+            batch = self._collect(pending)
+            started = time.perf_counter()
+            try:
+                predictions = self.predict_fn(np.stack([item[0] for item in batch]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            with self._lock:
+                self._batches += 1
+                self._sequences += len(batch)
+                self._batch_sizes[len(batch)] += 1
+                self._queue_delays.extend(started - queued for _, queued, _ in batch)
+
+            for (_, _, future), prediction in zip(batch, predictions):
+                future.set_result(prediction)
+
+    def stats(self):
+        with self._lock:
+            delays = np.array(self._queue_delays) * 1000
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_delay_ms': self.max_delay * 1000,
+                'pending': self.pending,
+                'batches': self._batches,
+                'sequences': self._sequences,
+                'avg_batch_size': self._sequences / self._batches if self._batches else 0.0,
+                'batch_size_counts': {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                'queue_delay_ms': {
+                    'p50': float(np.percentile(delays, 50)) if delays.size else 0.0,
+                    'p99': float(np.percentile(delays, 99)) if delays.size else 0.0,
+                    'max': float(delays.max()) if delays.size else 0.0,
+                },
+            }
@@ -0,0 +1,151 @@
+"""Pack the sequence.npy training corpus into one memory-mapped array.
+
+The trainer's corpus is thousands of <folder>/<action>/<n>/sequence.npy
+files. Packing copies every (5, 126) sequence into a single float32 file,
+so training opens three files instead of thousands and maps the data
+without copying it:
+    <out>/sequences.npy  float32 (N, 5, 126)
+    <out>/labels.npy     int16 (N,), index into actions
+    <out>/meta.json      actions, shape, count and per-action totals
+The sequences to pack come from the manifest (manifest.py), refreshed first.
+    python dataset.py pack ASL_FINAL_MODEL/hands ASL_FINAL_MODEL/Hands_Only_Data
+    python test_request.py --packed ASL_FINAL_MODEL/packed
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from manifest import DATA_FOLDERS, MANIFEST_PATH, SEQUENCE_SHAPE, actions, load_manifest
+
+PACKED_DIR = 'ASL_FINAL_MODEL/packed'
+FORMAT_VERSION = 1
+
+
+def load_sequences(folders=DATA_FOLDERS, manifest_path=MANIFEST_PATH, missing_ok=False):
+    # The whole corpus in memory, read straight into one float32 array, for
+    # tools that do not need a packed copy. An empty corpus is an error unless
+    # missing_ok, which returns (None, None) for callers with a fallback.
+    entries = load_manifest(folders, manifest_path).entries()
+    if not entries:
+        if missing_ok:
+            return None, None
+        raise SystemExit(f"No usable (5, 126) sequence.npy files under {', '.join(folders)}")
+    X = np.empty((len(entries),) + SEQUENCE_SHAPE, dtype=np.float32)
+    for i, (path, _) in enumerate(entries):
+        X[i] = np.load(path)
+    return X, np.array([label for _, label in entries])
+
+
+# === Train/validation split shared by test_request.py, quantize.py and sweep.py ===
+def train_val_split(labels, validation=0.1, seed=42):
+    # (train indices, validation indices), stratified on the one-hot rows the
+    # trainer has always split on: sklearn orders those classes differently
+    # from the integer labels, so stratifying on labels picks other sequences
+    from sklearn.model_selection import train_test_split
+
+    labels = np.asarray(labels)
+    counts = np.bincount(labels, minlength=len(actions))
+    # sklearn cannot stratify a label seen only once; such a set is split unstratified
+    stratify = np.eye(len(actions), dtype=int)[labels] if counts[counts > 0].min() > 1 else None
+    return train_test_split(np.arange(len(labels)), test_size=validation, random_state=seed, stratify=stratify)
+
+
+# === Which manifest entries a pack holds, to tell when it is out of date ===
+def entries_digest(entries):
+    digest = hashlib.sha1()
+    for path, label in entries:
+        digest.update(f"{os.path.abspath(path)}\t{label}\n".encode())
+    return digest.hexdigest()
+
+
+def pack_is_current(meta, entries):
+    if meta.get('count') != len(entries):
+        return False
+    # Packs from before the digest was recorded can only be checked by count
+    return meta.get('entries_digest', entries_digest(entries)) == entries_digest(entries)
+
+
+# === Pack: stream each sequence straight into the memory-mapped output ===
+def pack_dataset(entries, out_dir, folders=(), skipped=0):
+    os.makedirs(out_dir, exist_ok=True)
+    sequences_path = os.path.join(out_dir, 'sequences.npy')
+    labels_path = os.path.join(out_dir, 'labels.npy')
+    meta_path = os.path.join(out_dir, 'meta.json')
+
+    # Written under temporary names and renamed at the end, so an interrupted
+    # pack never leaves a half-written dataset behind the old meta.json
+    sequences = np.lib.format.open_memmap(sequences_path + '.tmp', mode='w+', dtype=np.float32,
+                                          shape=(len(entries),) + SEQUENCE_SHAPE)
+    labels = np.empty(len(entries), dtype=np.int16)
+    for i, (path, label) in enumerate(entries):
+        sequences[i] = np.load(path)
+        labels[i] = label
+    sequences.flush()
+    del sequences
+    with open(labels_path + '.tmp', 'wb') as f:
+        np.save(f, labels)
+
+    meta = {
+        'format': FORMAT_VERSION,
+        'actions': actions.tolist(),
+        'shape': list(SEQUENCE_SHAPE),
+        'dtype': 'float32',
+        'count': len(entries),
+        'per_action': {action: int(np.sum(labels == idx)) for idx, action in enumerate(actions)},
+        'skipped': skipped,
+        'entries_digest': entries_digest(entries),
+        'folders': [os.path.abspath(folder) for folder in folders],
+        'packed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f, indent=2)
+    for path in (sequences_path, labels_path, meta_path):
+        os.replace(path + '.tmp', path)
+    return meta
+
+
+# === Load: zero-copy views over the packed files ===
+def load_packed(out_dir=PACKED_DIR):
+    with open(os.path.join(out_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{out_dir} was packed in format {meta.get('format')}, expected {FORMAT_VERSION}")
+    if meta['actions'] != actions.tolist():
+        raise ValueError(f"{out_dir} was packed with different actions: {meta['actions']}")
+    X = np.load(os.path.join(out_dir, 'sequences.npy'), mmap_mode='r')
+    y = np.load(os.path.join(out_dir, 'labels.npy'), mmap_mode='r')
+    if X.shape != (meta['count'],) + SEQUENCE_SHAPE or len(y) != meta['count']:
+        raise ValueError(f"{out_dir} does not match its meta.json (repack it)")
+    return X, y, meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['pack', 'info'])
+    parser.add_argument('folders', nargs='*', default=DATA_FOLDERS)
+    parser.add_argument('--out', default=PACKED_DIR)
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        X, _, meta = load_packed(args.out)
+        print(json.dumps({key: meta[key] for key in ('count', 'per_action', 'skipped', 'packed_at')}, indent=2))
+        print(f"{X.nbytes / 1e6:.1f} MB of sequences in {args.out}")
+        return
+
+    started = time.perf_counter()
+    manifest = load_manifest(args.folders, args.manifest)
+    entries, skipped = manifest.entries(), len(manifest.rejected())
+    if not entries:
+        raise SystemExit(f"No (5, 126) sequence.npy files under {', '.join(args.folders)}")
+    meta = pack_dataset(entries, args.out, args.folders, skipped)
+    print(f"Packed {meta['count']} sequences ({skipped} skipped) into {args.out} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Turn recorded clips into a <action>/<clip>/sequence.npy training corpus.
+
+The input holds one folder per action. Each clip in it is a video file or
+a folder of .jpg/.png frames:
+    recordings/hello/clip01.mp4
+    recordings/hello/clip02/0001.jpg ...
+--frames frames are sampled evenly across each clip. They go through the
+same steps as the servers' frames: BGR to RGB, the LANDMARK_DETECTOR graph
+with the app's settings, then sign_common.keypoints.extract_keypoints. The
+(frames, 126) float32 result is written to <out>/<action>/<clip>/sequence.npy.
+
+Clips are spread over a process pool with one warmed detector per worker.
+Sequences are written atomically and clips that already have one are
+skipped, so an interrupted run picks up where it stopped. The summary
+reports frames per second overall and per core (frames per CPU-second).
+    python extract.py recordings ASL_FINAL_MODEL/hands --workers 4 --index
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+# === Code shared with the servers lives one level up ===
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sign_common.detectors import LANDMARK_DETECTOR, create_detector
+from sign_common.keypoints import new_buffer, extract_keypoints
+
+from manifest import actions, load_manifest
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+SEQUENCE_LENGTH = 5
+
+# Same graph settings as the detector pool in app.py
+DETECTOR_KWARGS = {
+    'static_image_mode': True,
+    'model_complexity': 1,
+    'enable_segmentation': False,
+    'refine_face_landmarks': False,
+}
+
+
+# === Clips: (action, clip name, source path) ===
+def find_clips(input_dir):
+    clips = []
+    for action in actions:
+        action_dir = os.path.join(input_dir, action)
+        if not os.path.isdir(action_dir):
+            continue
+        for name in sorted(os.listdir(action_dir)):
+            path = os.path.join(action_dir, name)
+            stem, extension = os.path.splitext(name)
+            if os.path.isdir(path):
+                clips.append((action, name, path))
+            elif extension.lower() in VIDEO_EXTENSIONS:
+                clips.append((action, stem, path))
+    return clips
+
+
+def sample_indices(total, frames):
+    return np.linspace(0, total - 1, frames).round().astype(int)
+
+
+def read_frames(path, frames):
+    # Yields the sampled BGR frames; a video only decodes the frames it keeps
+    if os.path.isdir(path):
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        if len(files) < frames:
+            raise ValueError(f"{len(files)} frames, need {frames}")
+        for index in sample_indices(len(files), frames):
+            image = cv2.imread(os.path.join(path, files[index]), cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError(f"cannot read {files[index]}")
+            yield image
+        return
+
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise ValueError("cannot open video")
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total < frames:
+            raise ValueError(f"{total} frames, need {frames}")
+        wanted = set(sample_indices(total, frames).tolist())
+        emitted = 0
+        for index in range(total):
+            if not capture.grab():
+                break
+            if index in wanted:
+                ok, image = capture.retrieve()
+                if ok:
+                    emitted += 1
+                    yield image
+        if emitted < frames:
+            raise ValueError(f"decoded {emitted} of {frames} sampled frames")
+    finally:
+        capture.release()
+
+
+# === Worker process: one warmed detector, reused for every clip ===
+_detector = None
+
+
+def _init_worker(backend):
+    global _detector
+    _detector = create_detector(backend, **DETECTOR_KWARGS)
+    # Load the graph's submodels before the first clip
+    _detector.process(np.zeros((256, 256, 3), dtype=np.uint8))
+
+
+def extract_clip(source, target, frames):
+    # Returns (frames run through the detector, detector seconds, CPU seconds)
+    cpu_started = time.process_time()
+    sequence = new_buffer(frames)
+    detect_seconds = 0.0
+    count = 0
+    for i, image in enumerate(read_frames(source, frames)):
+        started = time.perf_counter()
+        results = _detector.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        detect_seconds += time.perf_counter() - started
+        extract_keypoints(results, sequence[i])
+        count += 1
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Written under a temporary name so a killed run never leaves half a file
+    with open(target + '.tmp', 'wb') as f:
+        np.save(f, sequence)
+    os.replace(target + '.tmp', target)
+    return count, detect_seconds, time.process_time() - cpu_started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='folder with one sub-folder of clips per action')
+    parser.add_argument('out', help='corpus folder to write <action>/<clip>/sequence.npy into')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--frames', type=int, default=SEQUENCE_LENGTH, help='frames sampled per clip')
+    parser.add_argument('--detector', default=LANDMARK_DETECTOR, help='holistic or hands')
+    parser.add_argument('--overwrite', action='store_true', help='redo clips that already have a sequence')
+    parser.add_argument('--index', action='store_true', help='refresh the manifest for the output folder after')
+    args = parser.parse_args()
+
+    clips = find_clips(args.input)
+    jobs = []
+    for action, name, source in clips:
+        target = os.path.join(args.out, action, name, 'sequence.npy')
+        if args.overwrite or not os.path.exists(target):
+            jobs.append((source, target))
+    print(f"{len(clips)} clips found, {len(clips) - len(jobs)} already extracted, {len(jobs)} to do "
+          f"on {args.workers} workers")
+    if not jobs:
+        return
+
+    frames = detect_seconds = cpu_seconds = 0.0
+    failed = []
+    started = time.perf_counter()
+    # spawn: each worker builds its own MediaPipe graph from scratch
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                             initializer=_init_worker, initargs=(args.detector,)) as executor:
+        futures = {executor.submit(extract_clip, source, target, args.frames): source for source, target in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                count, detect, cpu = future.result()
+            except Exception as e:
+                failed.append((futures[future], str(e)))
+                continue
+            frames += count
+            detect_seconds += detect
+            cpu_seconds += cpu
+            if done % 50 == 0 or done == len(futures):
+                elapsed = time.perf_counter() - started
+                print(f"{done}/{len(futures)} clips, {frames / elapsed:.1f} frames/s")
+    elapsed = time.perf_counter() - started
+
+    print(f"\nExtracted {len(jobs) - len(failed)} clips ({int(frames)} frames) in {elapsed:.1f}s")
+    print(f"{frames / elapsed:.1f} frames/s overall (with worker start-up), "
+          f"{frames / cpu_seconds if cpu_seconds else 0.0:.1f} frames per CPU-second (per core), "
+          f"{detect_seconds / frames * 1000 if frames else 0.0:.1f} ms detector time per frame")
+    for source, reason in failed:
+        print(f"Skipped {source}: {reason}")
+
+    if args.index:
+        stats = load_manifest([args.out]).last_refresh
+        print(f"Manifest: {stats['sequences']} sequences, {stats['rejected']} rejected")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
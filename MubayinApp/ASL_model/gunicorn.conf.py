@@ -0,0 +1,46 @@
+import os
+
+# === Production server: gunicorn -c gunicorn.conf.py ===
+# Pre-fork workers, each with its own request threads. The app is imported once
+# in the master and then forked, so model weights that are safe to load there
+# are shared copy-on-write; every worker then warms its own detectors (and any
+# model that is not fork-safe) before taking traffic.
+#
+# Graceful restart: kill -HUP <master> replaces the workers, letting each
+# finish its in-flight requests first. Since the code is preloaded, deploying
+# new code needs kill -USR2 <master> followed by kill -TERM <old master>.
+os.environ['SIGN_PREFORK'] = '1'
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'app:app'
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# One process per core by default
+workers = int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))
+preload_app = True
+
+# A detector graph per request thread, rather than one per core in every worker
+os.environ.setdefault('DETECTOR_POOL_SIZE', str(threads))
+# The processes already use every core; keep BLAS from adding threads of its own
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+
+# Seconds a worker may take to warm up or to answer one request
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+# Seconds in-flight requests get to finish on restart or shutdown
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+# Recycle a worker after this many requests (0 = never), staggered by the jitter
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+
+def post_worker_init(worker):
+    import app
+    app.warm_up_worker()
+
+
+def worker_exit(server, worker):
+    import app
+    app.detector_pool.close()
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+# === Inference configuration ===
+MODEL_PATH = os.environ.get('MODEL_PATH', 'model/final_hands_asl_lstm_best_model.h5')
+# keras | tf_function | tflite | numpy
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'tf_function')
+# Weights the tflite backend loads: float32 | float16 | int8 (see quantize.py)
+MODEL_PRECISION = os.environ.get('MODEL_PRECISION', 'float32')
+
+SEQUENCE_SHAPE = (5, 126)
+
+
+def _load_keras_model(model_path):
+    from tensorflow.keras.models import load_model
+    return load_model(model_path)
+
+
+def _export_path(model_path, extension):
+    return os.path.splitext(model_path)[0] + extension
+
+
+def tflite_path(model_path, precision='float32'):
+    # <model>.tflite for float32, <model>.float16.tflite / <model>.int8.tflite
+    # for the quantized variants
+    if precision == 'float32':
+        return _export_path(model_path, '.tflite')
+    return _export_path(model_path, f'.{precision}.tflite')
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _export_is_current(export_path, model_path):
+    # Exports record the hash of the .h5 they were made from, so a retrained
+    # model is not silently served with old weights
+    if not os.path.exists(model_path):
+        return True
+    with np.load(export_path, allow_pickle=False) as data:
+        if 'source_sha256' not in data.files:
+            return True
+        return str(data['source_sha256']) == _sha256(model_path)
+
+
+# === Baseline: Keras model.predict (builds a data adapter on every call) ===
+class KerasEngine:
+    name = 'keras'
+    fork_safe = False
+
+    def __init__(self, model_path=MODEL_PATH, model=None):
+        self.model = model if model is not None else _load_keras_model(model_path)
+
+    def predict(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+# === Traced tf.function with a fixed (None, 5, 126) input signature ===
+class TFFunctionEngine:
+    name = 'tf_function'
+    fork_safe = False
+
+    def __init__(self, model_path=MODEL_PATH, model=None):
+        import tensorflow as tf
+
+        self.model = model if model is not None else _load_keras_model(model_path)
+        self._forward = tf.function(
+            self._call,
+            input_signature=[tf.TensorSpec((None,) + SEQUENCE_SHAPE, tf.float32)]
+        )
+        # Trace once now instead of on the first request
+        self._forward(np.zeros((1,) + SEQUENCE_SHAPE, dtype=np.float32))
+
+    def _call(self, batch):
+        return self.model(batch, training=False)
+
+    def predict(self, batch):
+        return self._forward(np.asarray(batch, dtype=np.float32)).numpy()
+
+
+# === TFLite interpreter on CPU ===
+# The LSTM converts to fused TFLite ops only with a static batch size of 1, so
+# a batch is run one sequence at a time through the same interpreter.
+class TFLiteEngine:
+    name = 'tflite'
+    # Built per worker; a .tflite file is mmapped, so its pages are still shared
+    fork_safe = False
+
+    def __init__(self, model_path=MODEL_PATH, model=None, precision=MODEL_PRECISION, model_content=None):
+        # The standalone tflite_runtime wheel avoids importing all of TensorFlow
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown model precision '{precision}' (choose from {', '.join(PRECISIONS)})")
+        self.precision = precision
+        path = tflite_path(model_path, precision)
+        if model_content is not None:
+            self.interpreter = Interpreter(model_content=model_content)
+        elif model is None and os.path.exists(path):
+            self.interpreter = Interpreter(model_path=path)
+        elif precision == 'float32':
+            model = model if model is not None else _load_keras_model(model_path)
+            self.interpreter = Interpreter(model_content=convert_to_tflite(model))
+        else:
+            # Quantized variants are only served after quantize.py has checked
+            # their accuracy, so they are never converted on the fly
+            raise FileNotFoundError(f"{path} not found (run: python quantize.py {model_path})")
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]['index']
+        self._output = self.interpreter.get_output_details()[0]['index']
+        # The interpreter keeps its tensors internally and is not thread-safe
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        outputs = []
+        with self._lock:
+            for sequence in batch:
+                self.interpreter.set_tensor(self._input, sequence[np.newaxis])
+                self.interpreter.invoke()
+                outputs.append(self.interpreter.get_tensor(self._output)[0].copy())
+        return np.stack(outputs)
+
+
+# === Pure-NumPy forward pass over exported weights (no TensorFlow at runtime) ===
+def _sigmoid(x):
+    # 1 / (1 + e^-x) without overflowing e^-x for large negative x
+    return np.exp(-np.logaddexp(0.0, -x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'softmax': _softmax,
+}
+
+
+def _lstm_forward(x, layer):
+    # Keras packs the four gates as [input, forget, cell, output]
+    kernel, recurrent, bias = layer['kernel'], layer['recurrent_kernel'], layer['bias']
+    activation = ACTIVATIONS[layer['activation']]
+    recurrent_activation = ACTIVATIONS[layer['recurrent_activation']]
+    units = recurrent.shape[0]
+
+    batch, steps, _ = x.shape
+    h = np.zeros((batch, units), dtype=np.float32)
+    c = np.zeros((batch, units), dtype=np.float32)
+    projected = x @ kernel + bias  # input projection for all timesteps at once
+    outputs = []
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        g = activation(z[:, 2 * units:3 * units])
+        o = recurrent_activation(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * activation(c)
+        outputs.append(h)
+    return np.stack(outputs, axis=1) if layer['return_sequences'] else h
+
+
+class NumpyEngine:
+    name = 'numpy'
+    # Only NumPy arrays, so it can be loaded before a pre-fork server forks
+    fork_safe = True
+
+    def __init__(self, model_path=MODEL_PATH, model=None):
+        npz_path = _export_path(model_path, '.npz')
+        exported = model is None and os.path.exists(npz_path)
+        if exported and not _export_is_current(npz_path, model_path):
+            print(f"{npz_path} was exported from a different model; converting {model_path} "
+                  f"instead (rerun: python inference.py export)")
+            exported = False
+        if exported:
+            self.layers = load_numpy_weights(npz_path)
+        else:
+            model = model if model is not None else _load_keras_model(model_path)
+            self.layers = numpy_layers_from_keras(model)
+
+    def predict(self, batch):
+        x = np.asarray(batch, dtype=np.float32)
+        for layer in self.layers:
+            if layer['type'] == 'LSTM':
+                x = _lstm_forward(x, layer)
+            elif layer['type'] == 'Dense':
+                x = ACTIVATIONS[layer['activation']](x @ layer['kernel'] + layer['bias'])
+        return x
+
+
+ENGINES = {
+    KerasEngine.name: KerasEngine,
+    TFFunctionEngine.name: TFFunctionEngine,
+    TFLiteEngine.name: TFLiteEngine,
+    NumpyEngine.name: NumpyEngine,
+}
+
+
+def load_engine(backend=INFERENCE_BACKEND, model_path=MODEL_PATH, model=None):
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown inference backend '{backend}' (choose from {', '.join(ENGINES)})")
+    return ENGINES[backend](model_path=model_path, model=model)
+
+
+def fork_safe(backend=INFERENCE_BACKEND):
+    # TensorFlow's runtime threads do not survive fork(), so only engines
+    # without it may be loaded in the gunicorn master
+    return getattr(ENGINES.get(backend), 'fork_safe', False)
+
+
+# === Export helpers ===
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+def _calibration_supported(model):
+    # TFLite's calibrator crashes (segfault, TF 2.15) on LSTMs with an
+    # activation other than tanh, which includes the relu LSTMs the trainer
+    # builds; those get int8 weights with activations quantized at run time
+    return all(layer.get_config().get('activation') == 'tanh'
+               for layer in model.layers if type(layer).__name__ == 'LSTM')
+
+
+def convert_to_tflite(model, precision='float32', representative_data=None):
+    # float16 halves the weights. int8 stores int8 weights and, when the model
+    # allows it, calibrates activation ranges on representative_data (an
+    # iterable of (5, 126) sequences). Inputs and outputs stay float32 either
+    # way, so the server code does not change.
+    import tensorflow as tf
+
+    forward = tf.function(
+        lambda batch: model(batch, training=False),
+        input_signature=[tf.TensorSpec((1,) + SEQUENCE_SHAPE, tf.float32)]
+    )
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([forward.get_concrete_function()], model)
+    if precision == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif precision == 'int8':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if representative_data is not None and _calibration_supported(model):
+            converter.representative_dataset = lambda: (
+                [np.asarray(sequence, dtype=np.float32)[np.newaxis]] for sequence in representative_data
+            )
+    elif precision != 'float32':
+        raise ValueError(f"Unknown model precision '{precision}' (choose from {', '.join(PRECISIONS)})")
+    return converter.convert()
+
+
+def numpy_layers_from_keras(model):
+    layers = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+        if kind == 'LSTM':
+            kernel, recurrent, bias = layer.get_weights()
+            layers.append({
+                'type': kind,
+                'activation': config['activation'],
+                'recurrent_activation': config['recurrent_activation'],
+                'return_sequences': config['return_sequences'],
+                'kernel': kernel, 'recurrent_kernel': recurrent, 'bias': bias,
+            })
+        elif kind == 'Dense':
+            kernel, bias = layer.get_weights()
+            layers.append({'type': kind, 'activation': config['activation'], 'kernel': kernel, 'bias': bias})
+        elif kind != 'Dropout':
+            raise ValueError(f"NumPy backend does not support layer type {kind}")
+    return layers
+
+
+def save_numpy_weights(layers, path, source_sha256=''):
+    arrays, specs = {}, []
+    for index, layer in enumerate(layers):
+        spec = {}
+        for key, value in layer.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{index}_{key}"] = value.astype(np.float32)
+            else:
+                spec[key] = value
+        specs.append(spec)
+    np.savez(path, layers=np.array(json.dumps(specs)), source_sha256=np.array(source_sha256), **arrays)
+
+
+def load_numpy_weights(path):
+    with np.load(path, allow_pickle=False) as data:
+        specs = json.loads(str(data['layers']))
+        layers = []
+        for index, spec in enumerate(specs):
+            layer = dict(spec)
+            for name in data.files:
+                if name.startswith(f"{index}_"):
+                    layer[name[len(f"{index}_"):]] = data[name]
+            layers.append(layer)
+    return layers
+
+
+# === Usage: python inference.py export [model_path] ===
+# Writes <model>.tflite and <model>.npz next to the .h5 so the tflite and numpy
+# backends can start without converting. The float16/int8 variants come from
+# quantize.py, which checks their accuracy first.
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'export':
+        print("Usage: python inference.py export [model_path]")
+        sys.exit(1)
+
+    path = sys.argv[2] if len(sys.argv) > 2 else MODEL_PATH
+    keras_model = _load_keras_model(path)
+
+    with open(_export_path(path, '.tflite'), 'wb') as f:
+        f.write(convert_to_tflite(keras_model))
+    save_numpy_weights(numpy_layers_from_keras(keras_model), _export_path(path, '.npz'), _sha256(path))
+    print(f"Exported {_export_path(path, '.tflite')} and {_export_path(path, '.npz')}")
@@ -0,0 +1,197 @@
+"""Index of the sequence.npy corpus, rebuilt incrementally.
+
+The manifest records every sequence's path, size, mtime, shape and label, and
+the sequences rejected when they were indexed (wrong shape, not float, NaN or
+inf, unreadable), so training never re-lists the tree or re-checks files.
+A refresh re-lists only the action directories whose mtime changed, which is
+what adding or deleting a recording does, and re-reads only the files whose
+size or mtime changed. Overwriting a sequence.npy in place leaves its action
+directory untouched; --full stats every file to catch that too.
+    python manifest.py                       refresh ASL_FINAL_MODEL/manifest.json
+    python manifest.py --full --rejected     full check, list rejected sequences
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Label order shared by the trainer, app.py and quantize.py
+actions = np.array([
+    'hello', 'thank_you', 'yes', 'no', 'please',
+    'help', 'sorry', 'nice_to_meet_you', 'how_are_you', 'Excuse_Me'
+])
+
+DATA_FOLDERS = ['ASL_FINAL_MODEL/hands', 'ASL_FINAL_MODEL/Hands_Only_Data']
+SEQUENCE_SHAPE = (5, 126)
+MANIFEST_PATH = os.environ.get('MANIFEST_PATH', 'ASL_FINAL_MODEL/manifest.json')
+# Listing and stat-ing are I/O bound, so more threads than cores pays off
+SCAN_WORKERS = int(os.environ.get('MANIFEST_SCAN_WORKERS', min(32, (os.cpu_count() or 1) * 4)))
+FORMAT_VERSION = 1
+
+
+def check_sequence(path):
+    # Returns (shape, None) for a usable sequence, (shape or None, reason) otherwise
+    try:
+        data = np.load(path, allow_pickle=False)
+    except (OSError, ValueError, EOFError) as e:
+        # EOFError: an empty or truncated file
+        return None, f"unreadable: {e or type(e).__name__}"
+    if data.shape != SEQUENCE_SHAPE:
+        return list(data.shape), f"shape {data.shape}, expected {SEQUENCE_SHAPE}"
+    if not np.issubdtype(data.dtype, np.floating):
+        return list(data.shape), f"dtype {data.dtype}, expected float"
+    if not np.isfinite(data).all():
+        return list(data.shape), "contains NaN or inf"
+    return list(data.shape), None
+
+
+# === The index: folder -> action -> sequence name -> record ===
+class Manifest:
+    def __init__(self, folders=DATA_FOLDERS, path=MANIFEST_PATH, workers=SCAN_WORKERS):
+        self.path = path
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.workers = max(1, workers)
+        self.tree = {}
+        self.last_refresh = {}
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+        # Anything indexed under another format or label order is rebuilt
+        if data.get('format') == FORMAT_VERSION and data.get('actions') == actions.tolist():
+            self.tree = data['folders']
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'format': FORMAT_VERSION, 'actions': actions.tolist(), 'folders': self.tree}, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    # === Refresh ===
+    def refresh(self, full=False):
+        started = time.perf_counter()
+        jobs = [(folder, label, action) for folder in self.folders for label, action in enumerate(actions)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='manifest') as executor:
+            # Pass 1: list the action directories that changed
+            listings = list(executor.map(lambda job: self._list_action(*job, full), jobs))
+            # Pass 2: check every new or modified file, across all directories at once
+            changed = [(record, item) for record, _, items in listings if record is not None for item in items]
+            checked = executor.map(self._index_file, [item for _, item in changed])
+            for (record, (name, _, _, _)), indexed in zip(changed, checked):
+                record['sequences'][name] = indexed
+
+        # Folders outside this refresh keep their entries, so indexing one
+        # folder does not throw away the rest of the manifest
+        tree = {folder: record for folder, record in self.tree.items() if folder not in self.folders}
+        for (folder, _, action), (record, _, _) in zip(jobs, listings):
+            if record is not None:
+                tree.setdefault(folder, {})[action] = record
+        self.tree = tree
+        self.last_refresh = {
+            'listed_dirs': sum(1 for record, listed, _ in listings if record is not None and listed),
+            'reused_dirs': sum(1 for record, listed, _ in listings if record is not None and not listed),
+            'checked_files': len(changed),
+            'seconds': time.perf_counter() - started,
+            'sequences': len(self.entries()),
+            'rejected': len(self.rejected()),
+        }
+        return self.last_refresh
+
+    def _list_action(self, folder, label, action, full):
+        # Returns (record or None, whether the directory was re-listed, files to check)
+        action_folder = os.path.join(folder, action)
+        try:
+            mtime_ns = os.stat(action_folder).st_mtime_ns
+        except OSError:
+            return None, False, []
+        previous = self.tree.get(folder, {}).get(action)
+        if previous is not None and previous['mtime_ns'] == mtime_ns and not full:
+            return previous, False, []
+
+        known = previous['sequences'] if previous is not None else {}
+        sequences, changed = {}, []
+        for name in sorted(os.listdir(action_folder)):
+            path = os.path.join(action_folder, name, 'sequence.npy')
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            old = known.get(name)
+            if old is not None and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                sequences[name] = old
+            else:
+                sequences[name] = None  # filled in by pass 2, keeping the sorted order
+                changed.append((name, path, stat, label))
+        return {'mtime_ns': mtime_ns, 'sequences': sequences}, True, changed
+
+    @staticmethod
+    def _index_file(item):
+        _, path, stat, label = item
+        shape, reason = check_sequence(path)
+        record = {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'shape': shape, 'label': label}
+        if reason:
+            record['rejected'] = reason
+        return record
+
+    # === Queries ===
+    def _records(self):
+        for folder in self.folders:
+            for action in actions:
+                record = self.tree.get(folder, {}).get(action)
+                if record is not None:
+                    yield from record['sequences'].values()
+
+    def entries(self):
+        # (path, label) of every usable sequence, in a stable order
+        return [(r['path'], r['label']) for r in self._records() if 'rejected' not in r]
+
+    def rejected(self):
+        return [(r['path'], r['rejected']) for r in self._records() if 'rejected' in r]
+
+    def stats(self):
+        labels = np.array([label for _, label in self.entries()], dtype=np.int64)
+        return {
+            'sequences': int(labels.size),
+            'rejected': len(self.rejected()),
+            'per_action': {action: int(np.sum(labels == idx)) for idx, action in enumerate(actions)},
+            'last_refresh': self.last_refresh,
+        }
+
+
+def load_manifest(folders=DATA_FOLDERS, path=MANIFEST_PATH, full=False):
+    # Refreshed and saved, ready for the trainer or an evaluation tool
+    manifest = Manifest(folders, path)
+    manifest.refresh(full=full)
+    if manifest.tree or os.path.exists(path):
+        manifest.save()
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folders', nargs='*', default=DATA_FOLDERS)
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--full', action='store_true', help='stat every file, not just changed directories')
+    parser.add_argument('--rejected', action='store_true', help='list rejected sequences and why')
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.folders, args.manifest, args.full)
+    print(json.dumps(manifest.stats(), indent=2))
+    if args.rejected:
+        for path, reason in manifest.rejected():
+            print(f"{path}: {reason}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+from sign_common.keypoints import new_buffer, extract_keypoints
+from sign_common.metrics import stage_seconds, record_frame
+
+# === Pipeline configuration ===
+# Frames allowed to wait in front of each stage; a full queue blocks the stage
+# before it, and a full first queue turns new requests away
+QUEUE_DEPTH = int(os.environ.get('PIPELINE_QUEUE_DEPTH', 64))
+DECODE_WORKERS = int(os.environ.get('PIPELINE_DECODE_WORKERS', 2))
+COLOR_WORKERS = int(os.environ.get('PIPELINE_COLOR_WORKERS', 1))
+# 0 = one landmark thread per detector in the pool
+LANDMARK_WORKERS = int(os.environ.get('PIPELINE_LANDMARK_WORKERS', 0))
+PACK_WORKERS = int(os.environ.get('PIPELINE_PACK_WORKERS', 1))
+# Sequences waiting on the batch scheduler at once
+CLASSIFY_WORKERS = int(os.environ.get('PIPELINE_CLASSIFY_WORKERS', 8))
+# Longest side of the frame handed to MediaPipe (0 = keep the original size)
+RESIZE = int(os.environ.get('PIPELINE_RESIZE', 0))
+# Seconds a request waits for room in the first queue
+SUBMIT_TIMEOUT = float(os.environ.get('PIPELINE_SUBMIT_TIMEOUT', 10))
+
+
+class PipelineBusy(Exception):
+    pass
+
+
+class DecodeError(Exception):
+    def __init__(self, index):
+        super().__init__(f"Failed to decode frame {index}")
+        self.index = index
+
+
+# === One request: its keypoint buffer and the future it is waiting on ===
+class SequenceJob:
+    def __init__(self, frames, classify, overlay_paths=None):
+        self.sequence = new_buffer(frames)
+        self.classify = classify
+        self.overlay_paths = overlay_paths
+        self.prediction = None
+        self.future = Future()
+        self._remaining = frames
+        self._lock = threading.Lock()
+
+    @property
+    def failed(self):
+        return self.future.done()
+
+    def frame_done(self):
+        # True for the call that completes the last frame
+        with self._lock:
+            self._remaining -= 1
+            return self._remaining == 0
+
+    def fail(self, error):
+        with self._lock:
+            if not self.future.done():
+                self.future.set_exception(error)
+
+    def finish(self):
+        with self._lock:
+            if not self.future.done():
+                self.future.set_result(self)
+
+
+class FrameTask:
+    def __init__(self, job, index, data):
+        self.job = job
+        self.index = index
+        self.data = data
+        self.key = None
+        self.image = None
+        self.rgb = None
+        self.results = None
+
+
+# === A pool of threads running one step, fed by a bounded queue ===
+class Stage:
+    def __init__(self, name, fn, workers, depth=QUEUE_DEPTH, metric=None):
+        self.name = name
+        # Stage label under sign_stage_seconds on /metrics
+        self.metric = metric or name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.depth = depth
+        self.next = None
+        self._queue = queue.Queue(maxsize=depth)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._started = None
+        self._items = 0
+        self._busy = 0.0
+        self._wait = 0.0
+        self._service = deque(maxlen=4096)
+
+    def _ensure_workers(self):
+        # Started on first use, and again in a forked gunicorn worker
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.depth)
+                for index in range(self.workers):
+                    threading.Thread(target=self._run, args=(self._queue,),
+                                     name=f'pipeline-{self.name}-{index}', daemon=True).start()
+                self._pid = os.getpid()
+                self._started = time.perf_counter()
+
+    def put(self, item, timeout=None):
+        self._ensure_workers()
+        self._queue.put((item, time.perf_counter()), timeout=timeout)
+
+    def _run(self, pending):
+        while True:
+            item, queued = pending.get()
+            start = time.perf_counter()
+            try:
+                result = self.fn(item)
+            except Exception as e:
+                # Items are FrameTasks except at the classify stage, which gets the job
+                getattr(item, 'job', item).fail(e)
+                result = None
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._items += 1
+                self._busy += elapsed
+                self._wait += start - queued
+                self._service.append(elapsed)
+            stage_seconds.observe(elapsed, stage=self.metric)
+
+            if result is not None:
+                self.next.put(result)
+
+    def stats(self):
+        with self._lock:
+            service = np.array(self._service) * 1000
+            running = time.perf_counter() - self._started if self._started else 0.0
+            return {
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'items': self._items,
+                'avg_ms': self._busy / self._items * 1000 if self._items else 0.0,
+                'p50_ms': float(np.percentile(service, 50)) if service.size else 0.0,
+                'p99_ms': float(np.percentile(service, 99)) if service.size else 0.0,
+                'avg_queue_wait_ms': self._wait / self._items * 1000 if self._items else 0.0,
+                # Share of the stage's thread time spent working; the stage
+                # nearest 1.0 is the one limiting throughput
+                'utilization': self._busy / (running * self.workers) if running else 0.0,
+            }
+
+
+# === decode -> color/resize -> landmarks -> keypoint pack -> classify ===
+# Every frame of every request flows through the same stages, so decoding one
+# frame overlaps with MediaPipe on another. cv2 and MediaPipe release the GIL
+# while they work, which is what lets the stages run side by side.
+class FramePipeline:
+    def __init__(self, detector_pool, keypoint_cache, overlay_writer, classify_fn,
+                 resize=RESIZE, submit_timeout=SUBMIT_TIMEOUT):
+        self.detector_pool = detector_pool
+        self.keypoint_cache = keypoint_cache
+        self.overlay_writer = overlay_writer
+        self.classify_fn = classify_fn
+        self.resize = resize
+        self.submit_timeout = submit_timeout or None
+        self.stages = [
+            Stage('decode', self._decode, DECODE_WORKERS),
+            Stage('color', self._color, COLOR_WORKERS),
+            Stage('landmarks', self._landmarks, LANDMARK_WORKERS or detector_pool.size, metric='mediapipe_detection'),
+            Stage('pack', self._pack, PACK_WORKERS, metric='extract_keypoints'),
+            Stage('classify', self._classify, CLASSIFY_WORKERS),
+        ]
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            stage.next = next_stage
+        self._classify_stage = self.stages[-1]
+
+    def submit(self, blobs, overlay_paths=None, classify=True):
+        # The future resolves to the SequenceJob: keypoints in job.sequence and,
+        # when classify is set, (label, confidence) in job.prediction
+        job = SequenceJob(len(blobs), classify, overlay_paths)
+        for index, data in enumerate(blobs):
+            try:
+                self.stages[0].put(FrameTask(job, index, data), timeout=self.submit_timeout)
+            except queue.Full:
+                job.fail(PipelineBusy(f"Frame pipeline is full after {self.submit_timeout}s"))
+                break
+        return job.future
+
+    def run(self, blobs, overlay_paths=None, classify=True):
+        return self.submit(blobs, overlay_paths, classify).result()
+
+    def _frame_done(self, job):
+        if not job.frame_done():
+            return None
+        if not job.classify:
+            job.finish()
+            return None
+        return job
+
+    def _decode(self, task):
+        job = task.job
+        if job.failed:
+            return None
+        # Resent frames come from the cache and skip the remaining stages
+        task.key = self.keypoint_cache.key(task.data)
+        if self.keypoint_cache.get(task.key, job.sequence[task.index]) is not None:
+            finished = self._frame_done(job)
+            if finished is not None:
+                self._classify_stage.put(finished)
+            return None
+        task.image = cv2.imdecode(np.frombuffer(task.data, dtype=np.uint8), cv2.IMREAD_COLOR) if task.data else None
+        if task.image is None:
+            job.fail(DecodeError(task.index))
+            return None
+        task.data = None
+        return task
+
+    def _color(self, task):
+        if task.job.failed:
+            return None
+        image = task.image
+        if self.resize and max(image.shape[:2]) > self.resize:
+            scale = self.resize / max(image.shape[:2])
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        task.rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return task
+
+    def _landmarks(self, task):
+        if task.job.failed:
+            return None
+        with self.detector_pool.checkout() as detector:
+            task.results = detector.process(task.rgb)
+        task.rgb = None
+        return task
+
+    def _pack(self, task):
+        job = task.job
+        if job.failed:
+            return None
+        keypoints = job.sequence[task.index]
+        extract_keypoints(task.results, keypoints)
+        record_frame(keypoints)
+        self.keypoint_cache.put(task.key, keypoints)
+        if job.overlay_paths:
+            self.overlay_writer.submit(task.image, task.results, job.overlay_paths[task.index])
+        return self._frame_done(job)
+
+    def _classify(self, job):
+        if job.failed:
+            return None
+        job.prediction = self.classify_fn(job.sequence)
+        job.finish()
+        return None
+
+    def stats(self):
+        stages = {stage.name: stage.stats() for stage in self.stages}
+        busiest = max(stages, key=lambda name: stages[name]['utilization'])
+        return {'stages': stages, 'bottleneck': busiest, 'resize': self.resize}
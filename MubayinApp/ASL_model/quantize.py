@@ -0,0 +1,120 @@
+"""Export float16 and int8 TFLite variants of the ASL model, gated on accuracy.
+
+Sequences come from the training corpus (<folder>/<action>/<n>/sequence.npy,
+the layout test_request.py trains on, or a dataset.py pack via --packed).
+The trainer's own validation split (dataset.train_val_split) is held out
+and the int8 calibration set is drawn from the rest. Each variant
+is scored on the validation set next to the float32 Keras model, and only
+variants whose accuracy drops by at most --max-drop are written:
+    model/final_hands_asl_lstm_best_model.float16.tflite
+    model/final_hands_asl_lstm_best_model.int8.tflite
+Serve one with INFERENCE_BACKEND=tflite MODEL_PRECISION=int8 (or float16).
+
+Without a corpus on disk, synthetic keypoint sequences stand in for it and
+the float32 model's own predictions are the labels, so the gate measures
+agreement with float32 rather than accuracy. Exits 1 if a variant is rejected.
+    python quantize.py --data ASL_FINAL_MODEL/hands ASL_FINAL_MODEL/Hands_Only_Data
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from dataset import DATA_FOLDERS, load_packed, load_sequences, train_val_split
+from inference import MODEL_PATH, SEQUENCE_SHAPE, KerasEngine, TFLiteEngine, convert_to_tflite, tflite_path, _load_keras_model
+
+
+# === Corpus: real sequences if present, otherwise synthetic ones ===
+def synthetic_sequences(count, seed=0):
+    # Landmark-like values: x and y in [0, 1], z near 0, and about a third of
+    # the hands missing (all zeros), as in frames where MediaPipe finds one hand
+    rng = np.random.default_rng(seed)
+    hands = rng.uniform(0.0, 1.0, size=(count,) + SEQUENCE_SHAPE).astype(np.float32)
+    hands = hands.reshape(count, SEQUENCE_SHAPE[0], 2, 21, 3)
+    hands[..., 2] = rng.normal(0.0, 0.05, size=hands[..., 2].shape)
+    hands[rng.random((count, SEQUENCE_SHAPE[0], 2)) < 0.33] = 0.0
+    return hands.reshape((count,) + SEQUENCE_SHAPE)
+
+
+# === Scoring ===
+def evaluate(engine, X, y):
+    started = time.perf_counter()
+    predictions = np.concatenate([engine.predict(X[i:i + 64]) for i in range(0, len(X), 64)])
+    elapsed = time.perf_counter() - started
+    return float(np.mean(np.argmax(predictions, axis=1) == y)), elapsed / len(X) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model', nargs='?', default=MODEL_PATH)
+    parser.add_argument('--data', nargs='+', default=DATA_FOLDERS, help='corpus folders')
+    parser.add_argument('--packed', help='read the corpus from a dataset.py pack instead of --data')
+    parser.add_argument('--precisions', nargs='+', choices=['float16', 'int8'], default=['float16', 'int8'])
+    parser.add_argument('--max-drop', type=float, default=float(os.environ.get('QUANTIZE_MAX_DROP', 0.01)),
+                        help='largest accepted validation accuracy drop vs float32 (0.01 = 1 point)')
+    parser.add_argument('--calibration', type=int, default=200, help='training sequences used to calibrate int8')
+    parser.add_argument('--synthetic', type=int, default=2000, help='sequences generated when no corpus is found')
+    parser.add_argument('--report', help='also write the results as JSON to this path')
+    args = parser.parse_args()
+
+    model = _load_keras_model(args.model)
+    reference = KerasEngine(model=model)
+
+    if args.packed:
+        X, y, _ = load_packed(args.packed)
+        X, y = np.asarray(X), np.asarray(y)
+    else:
+        X, y = load_sequences(args.data, missing_ok=True)
+    if X is None:
+        print(f"No sequence.npy files under {', '.join(args.data)}; using {args.synthetic} synthetic sequences "
+              f"labelled by the float32 model")
+        X = synthetic_sequences(args.synthetic)
+        y = np.argmax(reference.predict(X), axis=1)
+        source = 'synthetic'
+    else:
+        source = 'corpus'
+    train_idx, val_idx = train_val_split(y)
+    X_train, X_val, y_val = X[train_idx], X[val_idx], y[val_idx]
+    calibration = X_train[np.random.default_rng(0).permutation(len(X_train))[:args.calibration]]
+
+    baseline, baseline_ms = evaluate(reference, X_val, y_val)
+    results = {'model': args.model, 'data': source, 'validation': len(X_val), 'max_drop': args.max_drop,
+               'float32': {'accuracy': baseline, 'ms_per_sequence': baseline_ms,
+                           'bytes': os.path.getsize(args.model)},
+               'variants': {}}
+    print(f"{'precision':<10} {'accuracy':>9} {'drop':>7} {'ms/seq':>8} {'size KB':>9}  status")
+    print(f"{'float32':<10} {baseline:>9.4f} {'':>7} {baseline_ms:>8.3f} "
+          f"{os.path.getsize(args.model) / 1024:>9.1f}  reference (.h5)")
+
+    rejected = []
+    for precision in args.precisions:
+        content = convert_to_tflite(model, precision, calibration)
+        accuracy, ms = evaluate(TFLiteEngine(args.model, precision=precision, model_content=content), X_val, y_val)
+        drop = baseline - accuracy
+        accepted = drop <= args.max_drop
+        path = tflite_path(args.model, precision)
+        if accepted:
+            with open(path, 'wb') as f:
+                f.write(content)
+        else:
+            rejected.append(precision)
+            # Never leave an earlier, unchecked export where the server would load it
+            if os.path.exists(path):
+                os.remove(path)
+        results['variants'][precision] = {'accuracy': accuracy, 'drop': drop, 'ms_per_sequence': ms,
+                                          'bytes': len(content), 'accepted': accepted,
+                                          'path': path if accepted else None}
+        status = f"written to {path}" if accepted else f"rejected (drop > {args.max_drop})"
+        print(f"{precision:<10} {accuracy:>9.4f} {drop:>7.4f} {ms:>8.3f} {len(content) / 1024:>9.1f}  {status}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+    if rejected:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
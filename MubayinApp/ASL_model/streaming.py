@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# === Streaming configuration ===
+# Run the LSTM on every k-th frame once the window is full (1 = every frame)
+PREDICT_EVERY = int(os.environ.get('STREAM_PREDICT_EVERY', 1))
+# Seconds without a frame before a session is dropped
+IDLE_TIMEOUT = float(os.environ.get('STREAM_IDLE_TIMEOUT', 30))
+# Hard cap on live sessions; the least recently used one is dropped first
+MAX_SESSIONS = int(os.environ.get('STREAM_MAX_SESSIONS', 10000))
+
+
+# === Sliding window of the last N keypoint vectors for one call ===
+class Session:
+    def __init__(self, window, features):
+        self.window = np.zeros((window, features), dtype=np.float32)
+        self.frames = 0
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+
+    def push(self, keypoints):
+        # Copies the frame's keypoints into the next ring slot. Returns the
+        # window in chronological order once it is full and this frame is due
+        # for a prediction, otherwise None.
+        with self.lock:
+            size = len(self.window)
+            self.window[self.frames % size] = keypoints
+            self.frames += 1
+            self.last_seen = time.monotonic()
+            if self.frames < size or (self.frames - size) % PREDICT_EVERY:
+                return self.frames, None
+            start = self.frames % size
+            return self.frames, np.concatenate([self.window[start:], self.window[:start]])
+
+
+# === Session registry with idle eviction ===
+class SessionStore:
+    def __init__(self, window=5, features=126,
+                 idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+        self.window = window
+        self.features = features
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._evicted = 0
+
+    def get(self, session_id):
+        with self._lock:
+            self._sweep()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(self.window, self.features)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self._evicted += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def close(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _sweep(self):
+        # Sessions are kept in last-used order, so the idle ones sit at the front
+        now = time.monotonic()
+        if now - self._last_sweep < 1.0:
+            return
+        self._last_sweep = now
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen < self.idle_timeout:
+                break
+            del self._sessions[session_id]
+            self._evicted += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'evicted': self._evicted,
+                'predict_every': PREDICT_EVERY,
+                'idle_timeout_s': self.idle_timeout,
+            }
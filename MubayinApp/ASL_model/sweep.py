@@ -0,0 +1,259 @@
+"""Train a grid or random sample of LSTM configurations in parallel processes.
+
+The corpus is packed once (dataset.py), and repacked when it no longer
+matches the manifest. Every worker maps the same sequences.npy read-only,
+so the data is in memory once however many workers there are. Workers
+are separate processes, each with its TensorFlow threads pinned to
+--threads (and to its own cores with --pin-cores), so runs do not fight
+over the CPU. Each finished run is appended to <out>/results.jsonl and a
+rerun skips configurations already there. <out>/leaderboard.csv ranks
+them by validation accuracy, with the per-sequence inference latency and
+whether the run is on the speed/accuracy frontier (no other run is both
+faster and more accurate).
+    python sweep.py --workers 4 --threads 2
+    python sweep.py --random 12 --epochs 30 --latency-backend numpy
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from dataset import PACKED_DIR, load_packed, pack_dataset, pack_is_current, train_val_split
+from manifest import DATA_FOLDERS, actions, load_manifest
+
+# === Search space (the trainer's configuration is units=64, layers=2,
+# dropout=0.5, l2=0.001, batch_size=16, learning_rate=0.001) ===
+SPACE = {
+    'units': [32, 64, 128],
+    'layers': [1, 2],
+    'dropout': [0.2, 0.5],
+    'l2': [0.0, 0.001],
+    'batch_size': [16, 32],
+    'learning_rate': [0.001, 0.003],
+}
+
+SWEEP_DIR = 'ASL_FINAL_MODEL/sweep'
+
+
+def config_id(config):
+    return '-'.join(f"{key}={config[key]}" for key in SPACE)
+
+
+def configurations(sample=None, seed=0):
+    grid = [dict(zip(SPACE, values)) for values in itertools.product(*SPACE.values())]
+    if sample:
+        grid = random.Random(seed).sample(grid, min(sample, len(grid)))
+    return grid
+
+
+# === Worker process ===
+_worker = {}
+
+
+def _init_worker(packed_dir, threads, pin_cores, next_slot):
+    # Runs before TensorFlow is imported, so the thread settings take effect
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS'):
+        os.environ[name] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    with next_slot.get_lock():
+        slot = next_slot.value
+        next_slot.value += 1
+    if pin_cores and hasattr(os, 'sched_setaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+        mine = [cores[(slot * threads + i) % len(cores)] for i in range(threads)]
+        os.sched_setaffinity(0, mine)
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    X, labels, _ = load_packed(packed_dir)
+    _worker.update(X=X, labels=labels, slot=slot)
+
+
+def build_model(config):
+    import tensorflow as tf
+    from tensorflow.keras import regularizers
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+    regularizer = regularizers.l2(config['l2']) if config['l2'] else None
+    layers = [tf.keras.Input(shape=(5, 126))]
+    for index in range(config['layers']):
+        layers.append(LSTM(config['units'], return_sequences=index < config['layers'] - 1,
+                           activation='relu', kernel_regularizer=regularizer))
+        layers.append(Dropout(config['dropout']))
+    layers.append(Dense(len(actions), activation='softmax'))
+    model = tf.keras.Sequential(layers)
+    model.compile(optimizer=tf.keras.optimizers.Adam(config['learning_rate']),
+                  loss='categorical_crossentropy', metrics=['categorical_accuracy'])
+    return model
+
+
+def measure_latency(model, backend, repeats=200):
+    from inference import load_engine
+
+    engine = load_engine(backend, model=model)
+    sequence = np.zeros((1, 5, 126), dtype=np.float32)
+    for _ in range(10):
+        engine.predict(sequence)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine.predict(sequence)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def train_config(config, epochs, patience, latency_backend, seed, save_dir):
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+    from augment import AugmentedSequence
+
+    X, labels = _worker['X'], _worker['labels']
+    y = tf.keras.utils.to_categorical(labels, num_classes=len(actions))
+    # The trainer's split, the same for every configuration, so scores are comparable
+    train_idx, val_idx = train_val_split(labels)
+    X_val, y_val = np.asarray(X[val_idx]), y[val_idx]
+
+    tf.keras.utils.set_random_seed(seed)
+    model = build_model(config)
+    batches = AugmentedSequence(X, y, train_idx, batch_size=config['batch_size'], seed=seed)
+    started = time.perf_counter()
+    # workers=0 keeps augmentation on this process's own pinned threads
+    history = model.fit(batches, validation_data=(X_val, y_val), epochs=epochs, verbose=0, workers=0,
+                        callbacks=[EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)])
+    train_seconds = time.perf_counter() - started
+
+    _, val_accuracy = model.evaluate(X_val, y_val, verbose=0)
+    result = {
+        'id': config_id(config),
+        'config': config,
+        'val_accuracy': float(val_accuracy),
+        'latency_ms': measure_latency(model, latency_backend),
+        'latency_backend': latency_backend,
+        'params': int(model.count_params()),
+        'epochs_run': len(history.history['loss']),
+        'train_seconds': train_seconds,
+        'worker': _worker['slot'],
+    }
+    if save_dir:
+        path = os.path.join(save_dir, result['id'] + '.h5')
+        model.save(path)
+        result['model_path'] = path
+    return result
+
+
+# === Results ===
+def read_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def leaderboard(results):
+    ranked = sorted(results, key=lambda r: (-r['val_accuracy'], r['latency_ms']))
+    for result in ranked:
+        result['frontier'] = not any(
+            other['val_accuracy'] >= result['val_accuracy'] and other['latency_ms'] <= result['latency_ms']
+            and (other['val_accuracy'] > result['val_accuracy'] or other['latency_ms'] < result['latency_ms'])
+            for other in results
+        )
+    return ranked
+
+
+def write_leaderboard(ranked, path):
+    columns = ['rank', 'val_accuracy', 'latency_ms', 'frontier', *SPACE, 'params', 'epochs_run', 'train_seconds']
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rank, result in enumerate(ranked, 1):
+            writer.writerow([rank, f"{result['val_accuracy']:.4f}", f"{result['latency_ms']:.3f}", result['frontier'],
+                             *(result['config'][key] for key in SPACE),
+                             result['params'], result['epochs_run'], f"{result['train_seconds']:.1f}"])
+
+
+def ensure_packed(packed_dir, folders):
+    # Packs the corpus, or repacks it when the manifest no longer matches the pack
+    manifest = load_manifest(folders)
+    entries = manifest.entries()
+    meta_path = os.path.join(packed_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if not entries:
+            print(f"No sequences under {', '.join(folders)} to check {packed_dir} against; using it as packed")
+            return
+        if pack_is_current(meta, entries):
+            return
+        print(f"{packed_dir} is out of date ({meta.get('count')} sequences packed, {len(entries)} in the manifest)")
+    elif not entries:
+        raise SystemExit(f"No packed dataset in {packed_dir} and no sequences under {', '.join(folders)}")
+    print(f"Packing {len(entries)} sequences into {packed_dir}")
+    pack_dataset(entries, packed_dir, folders, len(manifest.rejected()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packed', default=PACKED_DIR, help='packed dataset (packed from --data if missing)')
+    parser.add_argument('--data', nargs='+', default=DATA_FOLDERS)
+    parser.add_argument('--out', default=SWEEP_DIR)
+    parser.add_argument('--random', type=int, help='train this many random configurations instead of the grid')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--patience', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=1, help='TensorFlow threads per worker')
+    parser.add_argument('--workers', type=int, help='parallel trainings (default: cores // threads)')
+    parser.add_argument('--pin-cores', action='store_true', help='bind each worker to its own cores')
+    parser.add_argument('--latency-backend', default='numpy', help='inference.py backend timed per config')
+    parser.add_argument('--save-models', action='store_true', help='keep every trained model as <out>/<id>.h5')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    ensure_packed(args.packed, args.data)
+    os.makedirs(args.out, exist_ok=True)
+    results_path = os.path.join(args.out, 'results.jsonl')
+    done = {result['id'] for result in read_results(results_path)}
+    pending = [config for config in configurations(args.random, args.seed) if config_id(config) not in done]
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    print(f"{len(pending)} configurations to train ({len(done)} already done) on {workers} workers "
+          f"x {args.threads} threads")
+
+    # spawn, not fork: every worker starts its own TensorFlow runtime
+    context = multiprocessing.get_context('spawn')
+    next_slot = context.Value('i', 0)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(args.packed, args.threads, args.pin_cores, next_slot)) as executor:
+        futures = {
+            executor.submit(train_config, config, args.epochs, args.patience, args.latency_backend,
+                            args.seed, args.out if args.save_models else None): config
+            for config in pending
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error training {config_id(futures[future])}:", e)
+                continue
+            with open(results_path, 'a') as f:
+                f.write(json.dumps(result) + '\n')
+            print(f"{result['val_accuracy']:.4f}  {result['latency_ms']:7.3f} ms  {result['id']}")
+
+    ranked = leaderboard(read_results(results_path))
+    write_leaderboard(ranked, os.path.join(args.out, 'leaderboard.csv'))
+    print(f"\n{'rank':>4} {'val acc':>8} {'ms/seq':>8}  frontier  config")
+    for rank, result in enumerate(ranked[:10], 1):
+        print(f"{rank:>4} {result['val_accuracy']:>8.4f} {result['latency_ms']:>8.3f}  "
+              f"{'*' if result['frontier'] else ' ':^8}  {result['id']}")
+    print(f"Leaderboard: {os.path.join(args.out, 'leaderboard.csv')}")
+
+
+if __name__ == '__main__':
+    main()
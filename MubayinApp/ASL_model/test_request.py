@@ -13,15 +13,26 @@
 # except Exception as e:
 #     print("❌ Error occurred while sending request:", e)
 import os
+import argparse
 import numpy as np
 import tensorflow as tf
-from sklearn.model_selection import train_test_split
 from tensorflow.keras.utils import to_categorical
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
 from tensorflow.keras import regularizers
 
+from augment import AugmentedSequence, fit_kwargs
+from dataset import load_packed, load_sequences, train_val_split
+
+# ⚙️ Options: --packed reads a dataset.py pack instead of walking the folders
+parser = argparse.ArgumentParser()
+parser.add_argument('--packed', help='directory written by: python dataset.py pack')
+parser.add_argument('--jitter-only', action='store_true',
+                    help='augment with Gaussian noise on every value, missing hands included, as older '
+                         'models were trained (drawn fresh each epoch rather than once)')
+args = parser.parse_args()
+
 # 📁 Paths
 FOLDER_1 = os.path.abspath('ASL_FINAL_MODEL/hands')
 FOLDER_2 = os.path.abspath('ASL_FINAL_MODEL/Hands_Only_Data')
@@ -33,37 +44,24 @@ actions = np.array([
     'help', 'sorry', 'nice_to_meet_you', 'how_are_you', 'Excuse_Me'
 ])
 
-#  Load data from folder
-def load_data_from_folder(folder_path):
-    X, y = [], []
-    for idx, action in enumerate(actions):
-        action_folder = os.path.join(folder_path, action)
-        if not os.path.exists(action_folder):
-            continue
-        for sequence in os.listdir(action_folder):
-            path = os.path.join(action_folder, sequence, 'sequence.npy')
-            if os.path.exists(path):
-                data = np.load(path)
-                if data.shape[1] == 126:  # hands-only check
-                    X.append(data)
-                    y.append(idx)
-    return X, y
-
-#  Load both datasets
-X1, y1 = load_data_from_folder(FOLDER_1)
-X2, y2 = load_data_from_folder(FOLDER_2)
+if args.packed:
+    #  Memory-mapped pack: no per-file loads and no list-to-array copy
+    X, labels, meta = load_packed(args.packed)
+    print(f"Loaded {meta['count']} packed sequences from {args.packed}")
+    y = to_categorical(labels, num_classes=len(actions)).astype(int)
+else:
+    #  Load both datasets via the manifest (manifest.py): only new or changed
+    #  recordings are checked, malformed ones were rejected when indexed
+    X, labels = load_sequences([FOLDER_1, FOLDER_2])
+    y = to_categorical(labels, num_classes=len(actions)).astype(int)
 
-# Combine both
-X = np.array(X1 + X2)
-y = to_categorical(np.array(y1 + y2)).astype(int)
-
-#  Split with stratification
-X_train, X_val, y_train, y_val = train_test_split(
-    X, y, test_size=0.1, random_state=42, stratify=y
-)
+#  Split with stratification (indices only: the training rows stay in X)
+train_idx, val_idx = train_val_split(labels)
+X_val, y_val = np.asarray(X[val_idx]), y[val_idx]
 
-# ✨ Add Gaussian noise to training data only
-X_train = X_train + np.random.normal(0, 0.01, X_train.shape)
+# ✨ Augment training batches on the fly, with fresh noise every epoch
+augment = {'frame_dropout': 0.0, 'hand_swap': 0.0, 'scale': 0.0, 'jitter_missing': True} if args.jitter_only else {}
+train_batches = AugmentedSequence(X, y, train_idx, batch_size=16, seed=42, **augment)
 
 #  Define LSTM model with dropout + L2 regularization
 model = Sequential([
@@ -84,11 +82,11 @@ early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights
 
 # 🚀 Train the model
 history = model.fit(
-    X_train, y_train,
+    train_batches,
     validation_data=(X_val, y_val),
     epochs=50,
-    batch_size=16,
-    callbacks=[early_stop]
+    callbacks=[early_stop],
+    **fit_kwargs()
 )
 
 # 💾 Save the final model
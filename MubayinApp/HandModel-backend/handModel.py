@@ -1,10 +1,22 @@
-from flask import Flask, request, jsonify
-import mediapipe as mp
+from flask import Flask, Response, request, jsonify
 import cv2
 import numpy as np
 import os
-import requests
-import pandas as pd
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Code shared with ASL_model lives one level up
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sign_common.keypoints import new_buffer, extract_keypoints, no_hands
+from sign_common.detectors import LANDMARK_DETECTOR
+from sign_common.detector_pool import DetectorPool, PoolTimeout
+from sign_common.overlay import OverlayWriter
+from sign_common.keypoint_cache import KeypointCache
+from sign_common.serving import PREFORK
+from sign_common import metrics
+
+from predictors import load_predictor, fork_safe
+from label_catalog import LabelCatalog
 
 app = Flask(__name__)
 
@@ -12,71 +24,94 @@ app = Flask(__name__)
 UPLOAD_FOLDER = './upload'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Load the CSV data for sign mappings
-try:
-    signs_df = pd.read_csv('./processed_features_ver2.csv')
-    print("Dataset loaded successfully.")
-except Exception as e:
-    print("Error loading dataset:", e)
+# Load the CSV data for sign mappings (reloaded automatically when the file changes)
+sign_catalog = LabelCatalog('./processed_features_ver2.csv')
 
+# Landmark overlays are a debug aid: off by default, rendered in the background
+overlay_writer = OverlayWriter()
 
-# Initialize MediaPipe Holistic
-mp_holistic = mp.solutions.holistic
-mp_drawing = mp.solutions.drawing_utils
-
-# Heroku model endpoint
+# Heroku model endpoint (MODEL_URL overrides it, e.g. for a local stand-in)
 #MODEL_URL = "https://arsl-model-889dcbb4a8c2.herokuapp.com/predict"
-MODEL_URL = "https://arsl-model-ver2-b7937d81e3ab.herokuapp.com/predict"
+MODEL_URL = os.environ.get('MODEL_URL', "https://arsl-model-ver2-b7937d81e3ab.herokuapp.com/predict")
+
+# Remote model at MODEL_URL or a local ArSL model file (PREDICTOR_BACKEND).
+# Under gunicorn a local model is loaded by each worker in warm_up_worker()
+predictor = load_predictor(url=MODEL_URL) if not PREFORK or fork_safe() else None
+
+# Warmed detectors for batch uploads; static mode since images are independent
+detector_pool = DetectorPool(static_image_mode=True, min_detection_confidence=0.5)
+
+# Threads for hashing and decoding uploaded images (both release the GIL)
+decode_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+# Keypoints of images seen before, keyed by a hash of the uploaded bytes
+keypoint_cache = KeypointCache(namespace=f"arsl-{LANDMARK_DETECTOR}-256")
+
+# Per-worker start-up under gunicorn (see gunicorn.conf.py): load what could
+# not be shared from the master and build the detector graphs before serving
+def warm_up_worker():
+    global predictor
+    if predictor is None:
+        predictor = load_predictor(url=MODEL_URL)
+    detector_pool.warm()
 
 # Function to process images using Holistic
 def mediapipe_detection(image, model):
     try:
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        image = cv2.resize(image, (256, 256))  # Resize image
-        image.flags.writeable = False
-        results = model.process(image)
-        image.flags.writeable = True
+        with metrics.stage_seconds.time(stage='mediapipe_detection'):
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            image = cv2.resize(image, (256, 256))  # Resize image
+            image.flags.writeable = False
+            results = model.process(image)
+            image.flags.writeable = True
         return results
     except Exception as e:
         print("Error processing image:", e)
         return None
 
-# Function to extract hand keypoints
-def extract_keypoints(results):
-    lh = np.array([[res.x, res.y, res.z] for res in results.left_hand_landmarks.landmark]).flatten() if results.left_hand_landmarks else np.zeros(21 * 3)
-    rh = np.array([[res.x, res.y, res.z] for res in results.right_hand_landmarks.landmark]).flatten() if results.right_hand_landmarks else np.zeros(21 * 3)
-    return np.concatenate([lh, rh])
-
-# Function to send features to the Heroku model
+# Function to send features to the configured model
 def send_to_model(features):
     try:
-        payload = {"features": features.tolist()}  # Prepare the feature list for sending
-        headers = {"Content-Type": "application/json"}  # Set the request headers
-        response = requests.post(MODEL_URL, json=payload, headers=headers)  # Send the request
-
-        if response.status_code == 200:
-            return response.json().get("predicted_sign", "Unknown")  # Return the predicted sign from the model
-        else:
-            print("Model prediction failed:", response.text)
-            return "Error"
+        with metrics.stage_seconds.time(stage='model'):
+            return predictor.predict(features)  # Return the predicted sign from the model
     except Exception as e:
         print("Error sending features to model:", e)
         return "Error"
 
-# Function to get Sign-Arabic from predicted sign ID
-def get_sign_arabic(predicted_sign):
+# Function to send many feature vectors to the model in one call
+def send_batch_to_model(features):
+    try:
+        with metrics.stage_seconds.time(stage='model'):
+            return predictor.predict_batch(features)
+    except Exception as e:
+        print("Error sending batch to model:", e)
+        return ["Error"] * len(features)
+
+# Function to decode an uploaded image from memory
+def decode_image(data):
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    with metrics.stage_seconds.time(stage='decode'):
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+# SignID from the model's answer, or None (looked up as "Unknown") if it is not a number
+def sign_id(predicted_sign):
     try:
         # Convert predicted_sign to integer if it's a string
-        predicted_sign_int = int(predicted_sign)
+        return int(predicted_sign)
     except ValueError:
         print(f"Error converting predicted_sign to integer: {predicted_sign}")
-        return "Unknown"
+        return None
 
-    # Search for the corresponding Arabic sign in the dataset
-    sign_row = signs_df[signs_df['SignID'] == predicted_sign_int]
-    if not sign_row.empty:
-        return sign_row['Sign-Arabic'].values[0]
-    return "Unknown"
+# Function to get Sign-Arabic from predicted sign ID
+def get_sign_arabic(predicted_sign):
+    # Look up the corresponding Arabic sign in the catalog
+    return sign_catalog.lookup(sign_id(predicted_sign))
+
+def get_signs_arabic(predicted_signs):
+    # One catalog lookup for a whole batch
+    return sign_catalog.lookup_many([sign_id(predicted_sign) for predicted_sign in predicted_signs])
 
 
 @app.route('/upload', methods=['POST'])
@@ -85,46 +120,120 @@ def process_image():
         return jsonify({'error': 'No file provided'}), 400
 
     file = request.files['file']
+    data = file.read()
     file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(file_path)
-
-    # Read the image
-    image = cv2.imread(file_path)
-    if image is None:
-        return jsonify({'error': 'Failed to read image'}), 400
-
-    # Process the image with Holistic
-    with mp_holistic.Holistic(min_detection_confidence=0.5, min_tracking_confidence=0.5) as holistic:
-        results = mediapipe_detection(image, holistic)
+    with metrics.stage_seconds.time(stage='file_io'), open(file_path, 'wb') as f:
+        f.write(data)
+
+    # A retried upload gets its keypoints from the cache
+    keypoints = new_buffer(1)[0]
+    cache_key = keypoint_cache.key(data)
+    if keypoint_cache.get(cache_key, keypoints) is None:
+        # Read the image
+        image = decode_image(data)
+        if image is None:
+            return jsonify({'error': 'Failed to read image'}), 400
+
+        # Process the image with a warmed detector (LANDMARK_DETECTOR) from the pool
+        try:
+            with detector_pool.checkout() as holistic:
+                results = mediapipe_detection(image, holistic)
+        except PoolTimeout as e:
+            return jsonify({'error': str(e)}), 503
+        if results is None:
+            return jsonify({'error': 'Failed to process image'}), 500
 
         # Extract hand keypoints
-        keypoints = extract_keypoints(results)
+        with metrics.stage_seconds.time(stage='extract_keypoints'):
+            extract_keypoints(results, keypoints)
+        metrics.record_frame(keypoints)
+        keypoint_cache.put(cache_key, keypoints)
+
+        # Draw landmarks and save the processed image (only if OVERLAY_ENABLED)
+        if overlay_writer.sample():
+            overlay_writer.submit(image, results, os.path.join(UPLOAD_FOLDER, f"processed_{file.filename}"))
+
+    if no_hands(keypoints):
+        return jsonify({'message': 'No hands detected!'}), 200
+
+    # Send keypoints to the model for prediction
+    predicted_sign = send_to_model(keypoints)
+
+    # Convert predicted sign ID to Sign-Arabic
+    sign_arabic = get_sign_arabic(predicted_sign)
+
+    return jsonify({
+        'message': 'Image processed successfully',
+        'predicted_sign': predicted_sign,
+        'sign_arabic': sign_arabic,
+        'keypoints': keypoints.tolist()
+    }), 200
+
+@app.route('/upload/batch', methods=['POST'])
+def process_batch():
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    payloads = [file.read() for file in files]
+    keypoints = new_buffer(len(payloads))
+    results = [None] * len(payloads)
+
+    # Images seen before come from the cache; the rest are decoded in parallel
+    keys = list(decode_executor.map(keypoint_cache.key, payloads))
+    misses = [i for i, key in enumerate(keys) if keypoint_cache.get(key, keypoints[i]) is None]
+    images = decode_executor.map(decode_image, [payloads[i] for i in misses])
 
-        # Draw landmarks if hands are detected
-        if results.left_hand_landmarks:
-            mp_drawing.draw_landmarks(image, results.left_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
-        if results.right_hand_landmarks:
-            mp_drawing.draw_landmarks(image, results.right_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
-
-        # Save the processed image
-        processed_path = os.path.join(UPLOAD_FOLDER, f"processed_{file.filename}")
-        cv2.imwrite(processed_path, image)
-
-        if np.all(keypoints == 0):
-            return jsonify({'message': 'No hands detected!'}), 200
-
-        # Send keypoints to the model for prediction
-        predicted_sign = send_to_model(keypoints)
-
-        # Convert predicted sign ID to Sign-Arabic
-        sign_arabic = get_sign_arabic(predicted_sign)
-
-        return jsonify({
-            'message': 'Image processed successfully',
-            'predicted_sign': predicted_sign,
-            'sign_arabic': sign_arabic,
-            'keypoints': keypoints.tolist()
-        }), 200
+    try:
+        if misses:
+            with detector_pool.checkout() as holistic:
+                for i, image in zip(misses, images):
+                    if image is None:
+                        results[i] = {'error': 'Failed to read image'}
+                        continue
+                    detection = mediapipe_detection(image, holistic)
+                    if detection is None:
+                        results[i] = {'error': 'Failed to process image'}
+                        continue
+                    with metrics.stage_seconds.time(stage='extract_keypoints'):
+                        extract_keypoints(detection, keypoints[i])
+                    metrics.record_frame(keypoints[i])
+                    keypoint_cache.put(keys[i], keypoints[i])
+    except PoolTimeout as e:
+        return jsonify({'error': str(e)}), 503
+
+    for i, result in enumerate(results):
+        if result is None and no_hands(keypoints[i]):
+            results[i] = {'message': 'No hands detected!'}
+
+    # One model call for every image that had hands
+    with_hands = [i for i, result in enumerate(results) if result is None]
+    if with_hands:
+        predicted_signs = send_batch_to_model(keypoints[with_hands])
+        signs_arabic = get_signs_arabic(predicted_signs)
+        for i, predicted_sign, sign_arabic in zip(with_hands, predicted_signs, signs_arabic):
+            results[i] = {
+                'message': 'Image processed successfully',
+                'predicted_sign': predicted_sign,
+                'sign_arabic': sign_arabic,
+                'keypoints': keypoints[i].tolist()
+            }
+
+    for file, result in zip(files, results):
+        result['filename'] = file.filename
+
+    return jsonify({'results': results}), 200
+
+# Prometheus metrics (names shared with ASL_model)
+@app.after_request
+def count_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.record_request(route, response.status_code)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=3002, debug=True)
\ No newline at end of file
@@ -0,0 +1,72 @@
+import csv
+import os
+import threading
+import time
+
+# === Catalog configuration ===
+# How often (seconds) lookups check whether the CSV changed on disk
+RELOAD_CHECK_INTERVAL = float(os.environ.get('LABELS_RELOAD_INTERVAL', 5))
+
+
+# === SignID -> Sign-Arabic table, loaded once and reloaded when the CSV changes ===
+# Only the two needed columns are read, with the csv module instead of pandas.
+class LabelCatalog:
+    def __init__(self, path, id_column='SignID', label_column='Sign-Arabic',
+                 check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.id_column = id_column
+        self.label_column = label_column
+        self.check_interval = check_interval
+        self._labels = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+            labels = {}
+            with open(self.path, newline='', encoding='utf-8-sig') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        # A features CSV repeats each SignID; its first row names it
+                        labels.setdefault(int(float(row[self.id_column])), row[self.label_column])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        except Exception as e:
+            print("Error loading dataset:", e)
+            return False
+
+        # Swap the whole dict so readers never see a half-built table
+        self._labels = labels
+        self._mtime = mtime
+        print(f"Dataset loaded successfully ({len(labels)} signs).")
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+
+    def lookup(self, sign_id, default="Unknown"):
+        self._maybe_reload()
+        return self._labels.get(sign_id, default)
+
+    def lookup_many(self, sign_ids, default="Unknown"):
+        self._maybe_reload()
+        labels = self._labels
+        return [labels.get(sign_id, default) for sign_id in sign_ids]
+
+    def __len__(self):
+        return len(self._labels)
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# === Model client configuration ===
+CONNECT_TIMEOUT = float(os.environ.get('MODEL_CONNECT_TIMEOUT', 3))
+READ_TIMEOUT = float(os.environ.get('MODEL_READ_TIMEOUT', 10))
+# Extra attempts after the first one, with exponential backoff between them
+RETRIES = int(os.environ.get('MODEL_RETRIES', 2))
+BACKOFF = float(os.environ.get('MODEL_BACKOFF', 0.2))
+# Consecutive failed calls before the circuit opens, and how long it stays open
+BREAKER_THRESHOLD = int(os.environ.get('MODEL_BREAKER_THRESHOLD', 5))
+BREAKER_RESET = float(os.environ.get('MODEL_BREAKER_RESET', 30))
+# Keep-alive connections held per host
+POOL_SIZE = int(os.environ.get('MODEL_POOL_SIZE', 10))
+
+# Gateway errors are worth retrying; other error statuses are not
+RETRY_STATUSES = {502, 503, 504}
+
+
+class ModelClientError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(ModelClientError):
+    pass
+
+
+# === Circuit breaker shared by the sync and async clients ===
+# After `threshold` consecutive failures every call fails fast for `reset`
+# seconds; the first call after that is let through as a trial.
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset = reset
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset:
+                raise CircuitOpenError("Model endpoint circuit is open")
+            # Half-open: allow this trial call, re-open at once if it fails
+            self._opened_at = None
+            self._failures = self.threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self._lock:
+            return 'open' if self._opened_at is not None else 'closed'
+
+
+def _as_list(features):
+    return features.tolist() if hasattr(features, 'tolist') else list(features)
+
+
+def _payload(features):
+    return {"features": _as_list(features)}
+
+
+def _backoff_delay(attempt, backoff):
+    return backoff * (2 ** attempt)
+
+
+# === Blocking client with a persistent keep-alive session ===
+class ModelClient:
+    def __init__(self, url, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, breaker=None, pool_size=POOL_SIZE):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def post(self, payload):
+        self.breaker.before_call()
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(_backoff_delay(attempt - 1, self.backoff))
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = ModelClientError(f"Model request failed: {e}")
+                continue
+            if response.status_code in RETRY_STATUSES:
+                error = ModelClientError(f"Model returned {response.status_code}: {response.text}", response.status_code)
+                continue
+            if response.status_code != 200:
+                # The endpoint answered, so it is up; the request itself was bad
+                self.breaker.record_success()
+                raise ModelClientError(f"Model prediction failed: {response.text}", response.status_code)
+            self.breaker.record_success()
+            return response.json()
+
+        self.breaker.record_failure()
+        raise error
+
+    def predict(self, features):
+        return self.post(_payload(features)).get("predicted_sign", "Unknown")
+
+    def predict_batch(self, features):
+        # {"batch": [[...126], ...]} -> {"predicted_signs": [...]}
+        signs = self.post({"batch": [_as_list(row) for row in features]}).get("predicted_signs")
+        if not isinstance(signs, list) or len(signs) != len(features):
+            raise ModelClientError("Model returned a malformed batch response")
+        return signs
+
+    def close(self):
+        self.session.close()
+
+
+# === asyncio client for use from an async server (needs aiohttp) ===
+class AsyncModelClient:
+    def __init__(self, url, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, breaker=None, pool_size=POOL_SIZE):
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("AsyncModelClient needs aiohttp (pip install aiohttp)")
+        self._aiohttp = aiohttp
+        self.url = url
+        self.timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size
+        self._session = None
+
+    def _get_session(self):
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = self._aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = self._aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def post(self, payload):
+        import asyncio
+
+        self.breaker.before_call()
+        session = self._get_session()
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(_backoff_delay(attempt - 1, self.backoff))
+            try:
+                async with session.post(self.url, json=payload) as response:
+                    if response.status in RETRY_STATUSES:
+                        error = ModelClientError(f"Model returned {response.status}: {await response.text()}", response.status)
+                        continue
+                    if response.status != 200:
+                        self.breaker.record_success()
+                        raise ModelClientError(f"Model prediction failed: {await response.text()}", response.status)
+                    body = await response.json()
+            except (self._aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = ModelClientError(f"Model request failed: {e}")
+                continue
+            self.breaker.record_success()
+            return body
+
+        self.breaker.record_failure()
+        raise error
+
+    async def predict(self, features):
+        return (await self.post(_payload(features))).get("predicted_sign", "Unknown")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
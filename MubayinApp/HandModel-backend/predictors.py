@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from model_client import ModelClient, ModelClientError
+from sign_common.metrics import prediction_confidence
+
+# === Predictor configuration ===
+# remote: POST keypoints to MODEL_URL; local: run the ArSL model in-process
+PREDICTOR_BACKEND = os.environ.get('PREDICTOR_BACKEND', 'remote')
+ARSL_MODEL_PATH = os.environ.get('ARSL_MODEL_PATH', 'model/arsl_model.h5')
+# Optional JSON list mapping the model's output index to a SignID. Without it
+# the output index is taken to be the SignID itself.
+ARSL_CLASSES_PATH = os.environ.get('ARSL_CLASSES_PATH', '')
+# Send /upload/batch as one {"batch": [...]} request. Off by default: the
+# deployed endpoint only documents {"features": [...]}, so frames go one per
+# call over the pooled session unless the endpoint is known to batch.
+MODEL_BATCH = os.environ.get('MODEL_BATCH', '0') == '1'
+# Seconds before an endpoint found to lack batch support is tried again
+MODEL_BATCH_REPROBE = float(os.environ.get('MODEL_BATCH_REPROBE', 300))
+# Frames of one batch sent at once when they go one per call
+MODEL_FANOUT = int(os.environ.get('MODEL_FANOUT', 4))
+
+
+# Statuses meaning the endpoint has no batch route or does not take the payload
+BATCH_UNSUPPORTED_STATUSES = {404, 405, 415}
+# The 500 a single-frame endpoint doing request.json['features'] sends back
+BATCH_UNSUPPORTED_ERROR = "KeyError: 'features'"
+
+
+def _batch_unsupported(error):
+    if error.status in BATCH_UNSUPPORTED_STATUSES:
+        return True
+    return error.status == 500 and BATCH_UNSUPPORTED_ERROR in str(error)
+
+
+# === Remote model over HTTP (the Heroku endpoint) ===
+class RemotePredictor:
+    name = 'remote'
+    # Opens no connections until the first call, so it can be built before fork
+    fork_safe = True
+
+    def __init__(self, url, client=None, batch=MODEL_BATCH, reprobe=MODEL_BATCH_REPROBE, fanout=MODEL_FANOUT):
+        self.client = client or ModelClient(url)
+        self.batch = batch
+        self.reprobe = reprobe
+        self.fanout = max(1, fanout)
+        # monotonic time before which batches go one frame per call
+        self._batch_retry_at = 0.0
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def batch_supported(self):
+        return self.batch and time.monotonic() >= self._batch_retry_at
+
+    def predict(self, features):
+        return self.client.predict(features)
+
+    def predict_batch(self, features):
+        # One request for the whole batch; endpoints that only know the
+        # single-frame contract get one call per frame over the pooled session
+        if self.batch_supported:
+            try:
+                return self.client.predict_batch(features)
+            except ModelClientError as e:
+                if e.status is None:
+                    raise
+                if _batch_unsupported(e):
+                    print(f"Model endpoint has no batch support, sending frames one by one "
+                          f"for the next {self.reprobe:.0f}s")
+                    self._batch_retry_at = time.monotonic() + self.reprobe
+                # Any other answer may be transient: this batch goes frame by
+                # frame and the next one is tried as a batch again
+        return self._predict_each(features)
+
+    def _predict_each(self, features):
+        if len(features) <= 1:
+            return [self.client.predict(row) for row in features]
+        return list(self._fanout_executor().map(self.client.predict, features))
+
+    def _fanout_executor(self):
+        # Created on first use so a gunicorn worker gets its own threads
+        # rather than inheriting dead ones from the master
+        with self._lock:
+            if self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.fanout, thread_name_prefix='model-fanout')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+
+# === ArSL model loaded from disk and run in this process ===
+class LocalPredictor:
+    name = 'local'
+    fork_safe = False
+
+    def __init__(self, model_path=ARSL_MODEL_PATH, classes_path=ARSL_CLASSES_PATH):
+        import tensorflow as tf
+        from tensorflow.keras.models import load_model
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ArSL model not found at {model_path} (set ARSL_MODEL_PATH)")
+        self.model = load_model(model_path)
+        self.classes = None
+        if classes_path:
+            with open(classes_path) as f:
+                self.classes = json.load(f)
+
+        # Trace once with the model's own input shape so requests skip
+        # model.predict's per-call setup
+        input_shape = tuple(self.model.input_shape[1:])
+        self._forward = tf.function(
+            lambda batch: self.model(batch, training=False),
+            input_signature=[tf.TensorSpec((None,) + input_shape, tf.float32)]
+        )
+        self._input_shape = input_shape
+        self._forward(np.zeros((1,) + input_shape, dtype=np.float32))
+
+    def predict(self, features):
+        return self.predict_batch([features])[0]
+
+    def predict_batch(self, features):
+        batch = np.asarray(features, dtype=np.float32).reshape((-1,) + self._input_shape)
+        probabilities = self._forward(batch).numpy()
+        indices = np.argmax(probabilities, axis=1)
+        # The remote endpoint returns only the sign, so only the local model
+        # feeds the confidence histogram
+        for confidence in probabilities.max(axis=1).tolist():
+            prediction_confidence.observe(confidence)
+        return [str(self.classes[index] if self.classes else index) for index in indices.tolist()]
+
+
+def load_predictor(backend=PREDICTOR_BACKEND, url=None):
+    if backend == RemotePredictor.name:
+        return RemotePredictor(url)
+    if backend == LocalPredictor.name:
+        return LocalPredictor()
+    raise ValueError(f"Unknown predictor backend '{backend}' (choose from remote, local)")
+
+
+def fork_safe(backend=PREDICTOR_BACKEND):
+    # TensorFlow does not survive fork(), so the local model loads per worker
+    predictor = {RemotePredictor.name: RemotePredictor, LocalPredictor.name: LocalPredictor}.get(backend)
+    return getattr(predictor, 'fork_safe', False)
@@ -0,0 +1,107 @@
+"""Hands-only vs Holistic landmark detectors: keypoint parity and throughput.
+
+Parity runs both detectors over a fixture image set and compares the
+126-float keypoint vectors slot by slot; it exits non-zero if a hand lands
+in a different slot, the coordinates drift past --tolerance, or a detector
+misses a hand the fixture's name promises. The committed fixtures are
+drawn signers (benchmarks/fixtures): both_hands, left_hand, right_hand and
+no_hands, named for the signer's own hands, and kept as PNG because JPEG
+artefacts are enough to flip the handedness of a drawn hand. Throughput is measured on the
+same images; Holistic stops early when it finds no person, so they all
+show a signer to keep the comparison fair.
+    python benchmarks/bench_detectors.py
+    python benchmarks/bench_detectors.py --images path/to/frames
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sign_common.detectors import DETECTORS, create_detector
+from sign_common.keypoints import HAND_FEATURES, new_buffer, extract_keypoints
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# Hands a fixture must show, by file name prefix; other names only get the parity check
+EXPECTED_HANDS = {
+    'both_hands': {'left', 'right'},
+    'left_hand': {'left'},
+    'right_hand': {'right'},
+    'no_hands': set(),
+}
+
+
+def load_images(folder):
+    names = sorted(f for f in os.listdir(folder) if f.lower().endswith(('.jpg', '.jpeg', '.png')))
+    images = [cv2.cvtColor(cv2.imread(os.path.join(folder, name)), cv2.COLOR_BGR2RGB) for name in names]
+    return images, names
+
+
+def keypoints_for(backend, images):
+    keypoints = new_buffer(len(images))
+    with create_detector(backend, static_image_mode=True, min_detection_confidence=0.5) as detector:
+        for i, image in enumerate(images):
+            extract_keypoints(detector.process(image), keypoints[i])
+    return keypoints
+
+
+def throughput(backend, images, repeats):
+    with create_detector(backend, static_image_mode=True, min_detection_confidence=0.5) as detector:
+        detector.process(images[0])
+        wall, cpu = time.perf_counter(), time.process_time()
+        for _ in range(repeats):
+            for image in images:
+                detector.process(image)
+        frames = repeats * len(images)
+        return frames / (time.perf_counter() - wall), (time.process_time() - cpu) / frames * 1000
+
+
+def parity(images, names, tolerance):
+    reference = keypoints_for('holistic', images)
+    candidate = keypoints_for('hands', images)
+    failures = 0
+    for name, ref, cand in zip(names, reference, candidate):
+        expected = next((hands for prefix, hands in EXPECTED_HANDS.items() if name.startswith(prefix)), None)
+        for side, part in (('left', slice(0, HAND_FEATURES)), ('right', slice(HAND_FEATURES, None))):
+            ref_found, cand_found = ref[part].any(), cand[part].any()
+            if expected is not None and (side in expected) != ref_found:
+                failures += 1
+                print(f"FAIL {name}: holistic {'missed' if side in expected else 'found'} the {side} hand")
+            if ref_found != cand_found:
+                failures += 1
+                print(f"FAIL {name}: {side} hand found by {'holistic' if ref_found else 'hands'} only")
+            elif ref_found:
+                # z is relative depth and scaled differently by the two graphs
+                drift = np.abs(ref[part].reshape(-1, 3)[:, :2] - cand[part].reshape(-1, 3)[:, :2]).max()
+                if drift > tolerance:
+                    failures += 1
+                    print(f"FAIL {name}: {side} hand x/y drift {drift:.4f} > {tolerance}")
+    print(f"Parity: {len(names)} images, {failures} mismatches")
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', default=FIXTURES, help='folder of fixture frames (jpg/png)')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    args = parser.parse_args()
+
+    images, names = load_images(args.images)
+    if not images:
+        raise SystemExit(f"No jpg/png frames in {args.images}")
+
+    print(f"{'detector':<10} {'frames/s':>10} {'CPU ms/frame':>14}")
+    for backend in DETECTORS:
+        fps, cpu_ms = throughput(backend, images, args.repeats)
+        print(f"{backend:<10} {fps:>10.1f} {cpu_ms:>14.2f}")
+
+    if not parity(images, names, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
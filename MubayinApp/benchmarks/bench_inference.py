@@ -0,0 +1,79 @@
+"""Compare per-sequence latency and peak RSS of the ASL inference backends.
+
+Each backend runs in its own subprocess so its peak RSS is measured in
+isolation. Run from anywhere:
+    python benchmarks/bench_inference.py --runs 500
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ASL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ASL_model'))
+sys.path.insert(0, ASL_DIR)
+
+
+def run_backend(backend, model_path, runs):
+    from inference import load_engine
+
+    start = time.perf_counter()
+    engine = load_engine(backend, model_path=model_path)
+    load_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    sequences = rng.random((runs, 5, 126), dtype=np.float32)
+    engine.predict(sequences[:1])  # first call outside the timings
+
+    latencies = []
+    for sequence in sequences:
+        start = time.perf_counter()
+        engine.predict(sequence[np.newaxis])
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+
+    return {
+        'backend': backend,
+        'load_s': load_s,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'outputs': engine.predict(sequences[:8]).tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--backends', default='keras,tf_function,tflite,numpy')
+    parser.add_argument('--model', default=os.path.join(ASL_DIR, 'model', 'final_hands_asl_lstm_best_model.h5'))
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.model, args.runs)))
+        return
+
+    results = []
+    for backend in args.backends.split(','):
+        output = subprocess.run(
+            [sys.executable, __file__, '--worker', backend, '--model', args.model, '--runs', str(args.runs)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    reference = np.array(results[0]['outputs'])
+    print(f"{'backend':<12} {'load s':>8} {'p50 ms':>8} {'p99 ms':>8} {'peak RSS MB':>12} {'max diff':>10}")
+    for result in results:
+        diff = np.abs(np.array(result['outputs']) - reference).max()
+        print(f"{result['backend']:<12} {result['load_s']:>8.2f} {result['p50_ms']:>8.3f} "
+              f"{result['p99_ms']:>8.3f} {result['peak_rss_mb']:>12.1f} {diff:>10.2e}")
+
+
+if __name__ == '__main__':
+    main()
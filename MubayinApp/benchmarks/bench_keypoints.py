@@ -0,0 +1,63 @@
+"""Microbenchmark: shared extract_keypoints vs the original list-comprehension version.
+
+Uses synthetic MediaPipe landmark lists so no camera or model is needed.
+Each timing is the best of --repeats runs, alternating between the two
+versions, since single runs of a few microseconds swing by more than the
+difference being measured:
+    python benchmarks/bench_keypoints.py --frames 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sign_common.keypoints import new_buffer, extract_keypoints
+
+
+# The function both services used before sign_common.keypoints
+def legacy_extract_keypoints(results):
+    lh = np.array([[res.x, res.y, res.z] for res in results.left_hand_landmarks.landmark]).flatten() if results.left_hand_landmarks else np.zeros(21 * 3)
+    rh = np.array([[res.x, res.y, res.z] for res in results.right_hand_landmarks.landmark]).flatten() if results.right_hand_landmarks else np.zeros(21 * 3)
+    return np.concatenate([lh, rh])
+
+
+def fake_hand(rng):
+    hand = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in rng.random((21, 3)):
+        landmark = hand.landmark.add()
+        landmark.x, landmark.y, landmark.z = x, y, z
+    return hand
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--repeats', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cases = {
+        'both hands': SimpleNamespace(left_hand_landmarks=fake_hand(rng), right_hand_landmarks=fake_hand(rng)),
+        'one hand': SimpleNamespace(left_hand_landmarks=None, right_hand_landmarks=fake_hand(rng)),
+        'no hands': SimpleNamespace(left_hand_landmarks=None, right_hand_landmarks=None),
+    }
+    buffer = new_buffer(5)
+
+    print(f"{'case':<12} {'legacy us':>10} {'shared us':>10} {'speedup':>8}")
+    for name, results in cases.items():
+        np.testing.assert_allclose(extract_keypoints(results, buffer[0]), legacy_extract_keypoints(results), rtol=1e-6)
+        legacy = shared = float('inf')
+        for _ in range(args.repeats):
+            legacy = min(legacy, timeit.timeit(lambda: legacy_extract_keypoints(results), number=args.frames))
+            shared = min(shared, timeit.timeit(lambda: extract_keypoints(results, buffer[0]), number=args.frames))
+        legacy, shared = legacy / args.frames, shared / args.frames
+        print(f"{name:<12} {legacy * 1e6:>10.2f} {shared * 1e6:>10.2f} {legacy / shared:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Per-frame latency of HandModel-backend's remote vs local predictor.
+
+The remote side hits --url, or a local stub with --stub-latency-ms of
+simulated network delay when no URL is given. The local side loads the
+ArSL model from --model and runs it in-process:
+    python benchmarks/bench_predictors.py --model HandModel-backend/model/arsl_model.h5
+    python benchmarks/bench_predictors.py --url https://.../predict --model ...
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'HandModel-backend'))
+from predictors import LocalPredictor, RemotePredictor
+from stub_model_server import start_stub_server
+
+
+def measure(predictor, frames):
+    predictor.predict(frames[0])
+    latencies = []
+    for features in frames:
+        start = time.perf_counter()
+        predictor.predict(features)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='remote /predict endpoint (default: local stub)')
+    parser.add_argument('--stub-latency-ms', type=float, default=80.0)
+    parser.add_argument('--model', help='ArSL model file for the local predictor')
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    frames = np.random.default_rng(0).random((args.frames, 126), dtype=np.float32)
+    url = args.url
+    if not url:
+        _, url = start_stub_server(latency_ms=args.stub_latency_ms)
+
+    predictors = [RemotePredictor(url)]
+    if args.model:
+        predictors.append(LocalPredictor(args.model))
+    else:
+        print("No --model given; skipping the local predictor")
+
+    print(f"{'predictor':<10} {'p50 ms':>8} {'p99 ms':>8}")
+    for predictor in predictors:
+        p50, p99 = measure(predictor, frames)
+        print(f"{predictor.name:<10} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Time from launching ASL_model/app.py to its first prediction.
+
+Each mode starts a fresh server process and polls it until it answers
+anything (listening), until /ready says ready, and until a /predict/frames
+request with five blank frames succeeds (first prediction):
+    keras        INFERENCE_BACKEND=keras: load the .h5 and call model.predict
+    tf_function  the default backend: load the .h5 and trace a tf.function
+    fast         ASL_FAST_START=1: NumPy weights from model/*.npz, no
+                 TensorFlow import, warm-up on a background thread
+    python benchmarks/bench_startup.py --runs 3
+The fast mode needs the exported weights (python inference.py export).
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ASL_DIR = os.path.join(BENCH_DIR, '..', 'ASL_model')
+
+MODES = {
+    'keras': {'INFERENCE_BACKEND': 'keras'},
+    'tf_function': {'INFERENCE_BACKEND': 'tf_function'},
+    'fast': {'ASL_FAST_START': '1'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_once(mode, frames, timeout=300):
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, **MODES[mode])
+    for name in ('INFERENCE_BACKEND', 'ASL_FAST_START'):
+        if name not in MODES[mode]:
+            env.pop(name, None)
+    code = f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"
+
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-c', code], cwd=ASL_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    listening = ready = None
+    try:
+        with requests.Session() as session:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"{mode}: server exited during start-up")
+                try:
+                    if ready is None:
+                        response = session.get(base + '/ready', timeout=5)
+                        listening = listening or time.perf_counter() - started
+                        if response.status_code == 200:
+                            ready = time.perf_counter() - started
+                    response = session.post(base + '/predict/frames', files=frames, timeout=30)
+                    if response.status_code == 200:
+                        first = time.perf_counter() - started
+                        return listening, ready or first, first
+                except requests.ConnectionError:
+                    pass
+                time.sleep(0.02)
+        raise RuntimeError(f"{mode}: no prediction within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    blank = cv2.imencode('.jpg', np.zeros((480, 640, 3), dtype=np.uint8))[1].tobytes()
+    frames = [('frames', (f'{i}.jpg', blank)) for i in range(5)]
+
+    print(f"{'mode':<12} {'listening s':>12} {'ready s':>9} {'first prediction s':>19}")
+    for mode in args.modes:
+        timings = np.array([start_once(mode, frames) for _ in range(args.runs)], dtype=np.float64)
+        listening, ready, first = np.median(timings, axis=0)
+        print(f"{mode:<12} {listening:>12.2f} {ready:>9.2f} {first:>19.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+"""End-to-end benchmark of the ASL and ArSL services, with JSON results.
+
+Starts each service under its gunicorn.conf.py, drives it over HTTP at each
+--concurrency level and records throughput, p50/p95/p99 latency, errors and
+the peak memory of the server's process tree. Runs offline on CPU: the ArSL
+model endpoint is replaced by a local stub with --stub-latency-ms of delay,
+and the keypoint cache is off so every request does the full work.
+
+    python benchmarks/e2e_bench.py --output results.json
+    python benchmarks/e2e_bench.py --recorded path/to/frames --concurrency 1 4 16
+    python benchmarks/e2e_bench.py --compare baseline.json --tolerance 0.15
+
+Targets: asl (POST /predict/frames), asl-legacy (POST /predict through the
+frames/ directory, which only works one request at a time, so it runs at
+concurrency 1) and hand (POST /upload).
+
+The corpus is the committed signer frames in benchmarks/fixtures (both
+hands, one hand, no hands), so /upload reaches the stubbed model call on
+most requests. --synthetic adds seeded blank, gradient, noise and blob
+frames, and --recorded adds .jpg/.png frames and video files (every
+--video-stride-th frame) from a directory. Each target records how many
+requests the model stub received; the run exits with status 1 if a target
+that calls the model never reached it, since its stub latency was then
+never measured.
+--compare exits with status 1 if any shared target/concurrency point lost
+more than --tolerance of its throughput or gained as much p99 latency.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+from load_test import free_port, start_server
+from stub_model_server import start_stub_server
+
+TARGETS = {
+    'asl': {'dir': 'ASL_model', 'path': '/predict/frames', 'field': 'frames', 'frames': 5, 'scratch': None},
+    'asl-legacy': {'dir': 'ASL_model', 'path': '/predict', 'field': None, 'frames': 5, 'scratch': 'frames'},
+    'hand': {'dir': 'HandModel-backend', 'path': '/upload', 'field': 'file', 'frames': 1, 'scratch': 'upload',
+             'calls_model': True},
+}
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+FIXTURES = os.path.join(BENCH_DIR, 'fixtures')
+
+
+# === Fixture corpus ===
+def synthetic_frames(count, height, width, seed=0):
+    rng = np.random.default_rng(seed)
+    kinds = ['blank', 'gradient', 'noise', 'blobs']
+    frames = []
+    for index in range(count):
+        kind = kinds[index % len(kinds)]
+        if kind == 'blank':
+            image = np.full((height, width, 3), rng.integers(0, 256), dtype=np.uint8)
+        elif kind == 'gradient':
+            ramp = np.linspace(0, 255, width, dtype=np.float32)
+            image = np.repeat(np.repeat(ramp[np.newaxis, :, np.newaxis], height, axis=0), 3, axis=2)
+            image = (image * rng.uniform(0.5, 1.0, size=3)).astype(np.uint8)
+        elif kind == 'noise':
+            image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        else:
+            image = np.full((height, width, 3), 40, dtype=np.uint8)
+            for _ in range(6):
+                center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+                axes = (int(rng.integers(20, width // 4)), int(rng.integers(20, height // 4)))
+                tone = (int(rng.integers(90, 140)), int(rng.integers(130, 180)), int(rng.integers(180, 230)))
+                cv2.ellipse(image, center, axes, float(rng.integers(0, 180)), 0, 360, tone, -1)
+        frames.append((f'{kind}_{index}.jpg', cv2.imencode('.jpg', image)[1].tobytes()))
+    return frames
+
+
+def recorded_frames(directory, video_stride):
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*'), recursive=True)):
+        name = os.path.relpath(path, directory)
+        if path.lower().endswith(('.jpg', '.jpeg', '.png')):
+            with open(path, 'rb') as f:
+                frames.append((name, f.read()))
+        elif path.lower().endswith(VIDEO_EXTENSIONS):
+            capture = cv2.VideoCapture(path)
+            index = 0
+            while True:
+                ok, image = capture.read()
+                if not ok:
+                    break
+                if index % video_stride == 0:
+                    frames.append((f'{name}#{index}.jpg', cv2.imencode('.jpg', image)[1].tobytes()))
+                index += 1
+            capture.release()
+    return frames
+
+
+# === Server process tree memory (Linux /proc) ===
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, so split after its ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def _memory(pid):
+    # PSS splits pages shared between the gunicorn master and its workers
+    # instead of counting them once per process; plain RSS is the fallback
+    for path, field in ((f'/proc/{pid}/smaps_rollup', 'Pss:'), (f'/proc/{pid}/status', 'VmRSS:')):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return 0
+
+
+def tree_memory(pid):
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _memory(current)
+        pending.extend(_children(current))
+    return total
+
+
+class PeakMemory:
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_memory(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# === Load generation ===
+class Client:
+    def __init__(self, base_url, target, corpus):
+        self.url = base_url + target['path']
+        self.target = target
+        self.corpus = corpus
+        self.frame_dir = os.path.join(APP_DIR, target['dir'], 'frames')
+
+    def request(self, session, offset):
+        count = self.target['frames']
+        frames = [self.corpus[(offset + i) % len(self.corpus)] for i in range(count)]
+        if self.target['field'] is None:
+            # Legacy contract: the frames sit in frames/ and the POST has no body
+            os.makedirs(self.frame_dir, exist_ok=True)
+            for index, (_, data) in enumerate(frames):
+                with open(os.path.join(self.frame_dir, f'{offset:08d}_{index}.jpg'), 'wb') as f:
+                    f.write(data)
+            return session.post(self.url, timeout=120)
+        return session.post(self.url, files=[(self.target['field'], frame) for frame in frames], timeout=120)
+
+
+def run_level(client, concurrency, requests_per_client):
+    def worker(index):
+        latencies, statuses = [], {}
+        with requests.Session() as session:
+            for step in range(requests_per_client):
+                start = time.perf_counter()
+                try:
+                    status = client.request(session, (index * requests_per_client + step) * client.target['frames']).status_code
+                except requests.RequestException:
+                    status = 'connection_error'
+                latencies.append(time.perf_counter() - start)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return latencies, statuses
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.concatenate([np.array(l) for l, _ in outcomes]) * 1000
+    statuses = {}
+    for _, counts in outcomes:
+        for status, count in counts.items():
+            statuses[status] = statuses.get(status, 0) + count
+    ok = statuses.get('200', 0)
+    return {
+        'concurrency': concurrency,
+        'requests': int(latencies.size),
+        'ok': ok,
+        'errors': int(latencies.size) - ok,
+        'statuses': statuses,
+        'elapsed_s': elapsed,
+        'throughput_rps': ok / elapsed,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max()),
+        },
+    }
+
+
+def wait_ready(client, server, timeout=300):
+    deadline = time.monotonic() + timeout
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError("Server exited during start-up")
+            try:
+                if client.request(session, 0).status_code == 200:
+                    return
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.5)
+    raise RuntimeError("Server did not become ready")
+
+
+def bench_target(name, args, corpus, env, stub):
+    target = TARGETS[name]
+    levels = [1] if target['field'] is None else args.concurrency
+    port = free_port()
+    client = Client(f'http://127.0.0.1:{port}', target, corpus)
+    # Directories the service writes into; removed afterwards unless they were already there
+    scratch = os.path.join(APP_DIR, target['dir'], target['scratch']) if target['scratch'] else None
+    remove_scratch = scratch is not None and not os.path.exists(scratch)
+    server = start_server(target, args.workers, args.threads, port, env)
+    results = []
+    stub_before = stub.requests_served
+    try:
+        started = time.perf_counter()
+        wait_ready(client, server)
+        startup_s = time.perf_counter() - started
+        for concurrency in levels:
+            run_level(client, concurrency, args.warmup)
+            with PeakMemory(server.pid) as memory:
+                level = run_level(client, concurrency, args.requests)
+            level['peak_memory_mb'] = memory.peak / (1024 * 1024)
+            results.append(level)
+            print(f"{name:<11} {concurrency:>5} {level['throughput_rps']:>8.1f} "
+                  f"{level['latency_ms']['p50']:>8.1f} {level['latency_ms']['p95']:>8.1f} "
+                  f"{level['latency_ms']['p99']:>8.1f} {level['peak_memory_mb']:>8.0f} {level['errors']:>6}", file=sys.stderr)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+        if remove_scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return {'target': name, 'path': target['path'], 'startup_s': startup_s, 'levels': results,
+            'model_stub_requests': stub.requests_served - stub_before}
+
+
+# === Regression check against an earlier results file ===
+def compare(current, baseline, tolerance):
+    def points(report):
+        return {(t['target'], level['concurrency']): level
+                for t in report['targets'] for level in t['levels']}
+
+    regressions = []
+    previous = points(baseline)
+    for key, level in points(current).items():
+        before = previous.get(key)
+        if before is None:
+            continue
+        if level['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{key[0]} @ {key[1]}: throughput {before['throughput_rps']:.1f} -> {level['throughput_rps']:.1f} req/s")
+        if level['latency_ms']['p99'] > before['latency_ms']['p99'] * (1 + tolerance):
+            regressions.append(f"{key[0]} @ {key[1]}: p99 {before['latency_ms']['p99']:.1f} -> {level['latency_ms']['p99']:.1f} ms")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=['asl', 'asl-legacy', 'hand'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--requests', type=int, default=40, help='measured requests per client per level')
+    parser.add_argument('--warmup', type=int, default=3, help='unmeasured requests per client per level')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='request threads per worker')
+    parser.add_argument('--synthetic', type=int, default=0, help='synthetic frames (no hands) to add to the corpus')
+    parser.add_argument('--size', type=int, nargs=2, default=[480, 640], metavar=('HEIGHT', 'WIDTH'),
+                        help='size of the synthetic frames')
+    parser.add_argument('--recorded', help='directory of recorded frames and/or videos to add')
+    parser.add_argument('--video-stride', type=int, default=5)
+    parser.add_argument('--stub-latency-ms', type=float, default=80.0)
+    parser.add_argument('--output', help='write the JSON results here (default: stdout)')
+    parser.add_argument('--compare', help='earlier results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    corpus = recorded_frames(FIXTURES, args.video_stride)
+    fixtures = len(corpus)
+    corpus += synthetic_frames(args.synthetic, *args.size)
+    if args.recorded:
+        corpus += recorded_frames(args.recorded, args.video_stride)
+    if not corpus:
+        sys.exit("The fixture corpus is empty")
+
+    stub, stub_url = start_stub_server(latency_ms=args.stub_latency_ms)
+    env = {'MODEL_URL': stub_url, 'PREDICTOR_BACKEND': 'remote'}
+
+    print(f"{'target':<11} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mem MB':>8} {'errors':>6}",
+          file=sys.stderr)
+    targets = [bench_target(name, args, corpus, env, stub) for name in args.targets]
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': git_commit(),
+        'host': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'config': {
+            'workers': args.workers, 'threads': args.threads, 'stub_latency_ms': args.stub_latency_ms,
+            'fixture_frames': fixtures, 'synthetic_frames': args.synthetic, 'synthetic_size': args.size,
+            'recorded_frames': len(corpus) - fixtures - args.synthetic,
+            'inference_backend': os.environ.get('INFERENCE_BACKEND', 'tf_function'),
+        },
+        'model_stub_requests': stub.requests_served,
+        'targets': targets,
+    }
+    stub.shutdown()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    unmeasured = [t['target'] for t in targets
+                  if TARGETS[t['target']].get('calls_model') and not t['model_stub_requests']]
+    for name in unmeasured:
+        print(f"Error: {name} never called the model stub, so no request went through the model path "
+              f"(does the corpus contain frames with hands?)", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print("Regression:", line, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+    if unmeasured:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
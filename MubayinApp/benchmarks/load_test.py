@@ -0,0 +1,170 @@
+"""Requests/sec of the gunicorn pre-fork server as the worker count grows.
+
+Starts the service under its gunicorn.conf.py once per worker count, keeps
+--concurrency clients per worker posting for --duration seconds and prints
+throughput, latency and the speedup over one worker. The keypoint cache is
+turned off so every request runs MediaPipe and the model:
+    python benchmarks/load_test.py --service asl --workers 1 2 4
+    python benchmarks/load_test.py --service hand --images path/to/jpgs
+
+The hand service talks to a local stub model server (--stub-latency-ms)
+unless --model-url is given. Frames are synthetic unless --images is set;
+on blank frames Holistic finds no person and returns early, so real images
+give the more honest numbers.
+"""
+import argparse
+import glob
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from stub_model_server import start_stub_server
+
+SERVICES = {
+    'asl': {'dir': 'ASL_model', 'path': '/predict/frames', 'field': 'frames', 'frames': 5},
+    'hand': {'dir': 'HandModel-backend', 'path': '/upload', 'field': 'file', 'frames': 1},
+}
+
+
+def load_frames(images, count):
+    if images:
+        paths = sorted(glob.glob(os.path.join(images, '*.jpg')) + glob.glob(os.path.join(images, '*.png')))
+        if not paths:
+            sys.exit(f"No .jpg/.png images in {images}")
+        blobs = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                blobs.append((os.path.basename(path), f.read()))
+    else:
+        rng = np.random.default_rng(0)
+        blobs = [(f'{i}.jpg', cv2.imencode('.jpg', rng.integers(0, 255, (480, 640, 3), dtype=np.uint8))[1].tobytes())
+                 for i in range(count)]
+    while len(blobs) < count:
+        blobs = blobs + blobs
+    return blobs
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def post(session, url, service, blobs):
+    files = [(service['field'], blob) for blob in blobs[:service['frames']]]
+    return session.post(url, files=files, timeout=120)
+
+
+def start_server(service, workers, threads, port, env):
+    env = dict(os.environ, **env, WEB_WORKERS=str(workers), WEB_THREADS=str(threads),
+               BIND=f'127.0.0.1:{port}', KEYPOINT_CACHE_MB='0', KEYPOINT_CACHE_DIR='')
+    conf = os.path.join(BENCH_DIR, '..', service['dir'], 'gunicorn.conf.py')
+    return subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', conf], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(url, service, blobs, server, timeout=300):
+    # Workers warm up before they accept, so the first answered request means ready
+    deadline = time.monotonic() + timeout
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                sys.exit("Server exited during start-up")
+            try:
+                if post(session, url, service, blobs).status_code == 200:
+                    return
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.5)
+    sys.exit("Server did not become ready")
+
+
+def drive(url, service, blobs, clients, duration):
+    deadline = time.monotonic() + duration
+
+    def client(index):
+        latencies, errors = [], 0
+        offset = index * service['frames']
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = post(session, url, service, blobs[offset:] + blobs[:offset])
+                except requests.RequestException:
+                    # A dead or refusing server counts as errors, not as a crashed client
+                    errors += 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+        return latencies, errors
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        outcomes = list(pool.map(client, range(clients)))
+    elapsed = time.monotonic() - started
+    latencies = np.concatenate([np.array(l) for l, _ in outcomes]) * 1000
+    errors = sum(e for _, e in outcomes)
+    if not latencies.size:
+        return 0.0, None, None, errors
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--service', choices=SERVICES, default='asl')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='worker counts to try (default: 1, 2, 4, ... up to the core count)')
+    parser.add_argument('--threads', type=int, default=2, help='request threads per worker')
+    parser.add_argument('--concurrency', type=int, default=2, help='clients per worker')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--images', help='directory of .jpg/.png frames to send')
+    parser.add_argument('--model-url', help='model endpoint for the hand service (default: local stub)')
+    parser.add_argument('--stub-latency-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+    service = SERVICES[args.service]
+    blobs = load_frames(args.images, service['frames'] * max(worker_counts) * args.concurrency)
+
+    env = {}
+    if args.service == 'hand':
+        model_url = args.model_url
+        if not model_url:
+            _, model_url = start_stub_server(latency_ms=args.stub_latency_ms)
+        env['MODEL_URL'] = model_url
+
+    print(f"{args.service}: {cores} cores, {args.threads} threads and {args.concurrency} clients per worker")
+    print(f"{'workers':>7} {'req/s':>8} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    baseline = None
+    for workers in worker_counts:
+        port = free_port()
+        url = f'http://127.0.0.1:{port}{service["path"]}'
+        server = start_server(service, workers, args.threads, port, env)
+        try:
+            wait_ready(url, service, blobs, server)
+            rate, p50, p99, errors = drive(url, service, blobs, workers * args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+        if p50 is None:
+            print(f"{workers:>7} no successful requests ({errors} errors)")
+            continue
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:>8.1f} {rate / baseline:>7.2f}x {p50:>8.1f} {p99:>8.1f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Local stand-in for the remote ArSL model endpoint used by HandModel-backend.
+
+Mimics the /predict contract ({"features": [...]} -> {"predicted_sign": ...},
+or {"batch": [[...], ...]} -> {"predicted_signs": [...]}) with configurable
+latency and error rate, so the model client can be exercised offline:
+    python benchmarks/stub_model_server.py --port 8500 --latency-ms 80
+    MODEL_URL=http://127.0.0.1:8500/predict python HandModel-backend/handModel.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_sign(features):
+    # Deterministic so repeated runs give the same answers
+    return str(max(range(len(features)), key=features.__getitem__) % 100) if features else "0"
+
+
+class StubModelHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoint
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.latency_ms / 1000.0)
+
+        if random.random() < self.server.error_rate:
+            self._reply(503, {"error": "stub failure"})
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+
+        self.server.requests_served += 1
+        if 'batch' in payload and self.server.batch_support:
+            self._reply(200, {"predicted_signs": [fake_sign(features) for features in payload['batch']]})
+        elif 'features' in payload:
+            self._reply(200, {"predicted_sign": fake_sign(payload['features'])})
+        elif 'batch' in payload:
+            # What a Flask endpoint doing request.json['features'] sends back
+            self._reply(500, {"error": "KeyError: 'features'"})
+        else:
+            self._reply(400, {"error": "missing features"})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(host='127.0.0.1', port=0, latency_ms=0.0, error_rate=0.0, batch_support=True):
+    # Serves from a daemon thread; returns the server and its /predict URL
+    server = ThreadingHTTPServer((host, port), StubModelHandler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.error_rate = error_rate
+    server.batch_support = batch_support
+    server.requests_served = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/predict"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8500)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--no-batch', action='store_true', help='fail the batch payload with a 500 like a single-frame endpoint')
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.host, args.port, args.latency_ms, args.error_rate, not args.no_batch)
+    print(f"Stub model serving {url} (latency {args.latency_ms} ms, error rate {args.error_rate})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Code shared by the ASL_model and HandModel-backend services so both build
+# features the same way.
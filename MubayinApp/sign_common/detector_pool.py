@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from sign_common.detectors import LANDMARK_DETECTOR, create_detector
+from sign_common.serving import PREFORK
+
+# === Pool configuration ===
+# One detector graph per worker thread; defaults to the number of CPU cores.
+POOL_SIZE = int(os.environ.get('DETECTOR_POOL_SIZE', os.cpu_count() or 1))
+# Seconds a request waits for a free graph before giving up (0 = wait forever)
+POOL_TIMEOUT = float(os.environ.get('DETECTOR_POOL_TIMEOUT', 10))
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# === Pool of warmed MediaPipe landmark detectors ===
+# A MediaPipe graph is not thread-safe, so each request checks one out for the
+# duration of its frames and hands it back afterwards.
+class DetectorPool:
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, backend=LANDMARK_DETECTOR,
+                 lazy=PREFORK, **detector_kwargs):
+        self.size = max(1, int(size))
+        self.timeout = timeout or None
+        self.backend = backend
+        self._detector_kwargs = detector_kwargs
+        # LIFO so the most recently used (hottest) graph is handed out first
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._pid = None
+
+        if not lazy:
+            self.warm()
+
+    def warm(self):
+        # Builds the graphs for this process. A worker forked from a master
+        # that already had a pool starts over, since the graphs' threads
+        # were not copied into it.
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._idle = queue.LifoQueue()
+            self._in_use = 0
+            for _ in range(self.size):
+                self._idle.put(self._create())
+            self._pid = os.getpid()
+
+    def _create(self):
+        detector = create_detector(self.backend, **self._detector_kwargs)
+        # Run one blank frame so the TFLite submodels are loaded up front
+        detector.process(np.zeros((256, 256, 3), dtype=np.uint8))
+        return detector
+
+    @contextmanager
+    def checkout(self):
+        if self._pid != os.getpid():
+            self.warm()
+        start = time.perf_counter()
+        try:
+            detector = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(f"No landmark detector free after {self.timeout}s")
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        try:
+            yield detector
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(detector)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': self.size - self._in_use,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': (self._total_wait / self._checkouts * 1000) if self._checkouts else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+            }
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
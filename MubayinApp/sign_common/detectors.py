@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import types
+
+# === Detector configuration ===
+# holistic: full MediaPipe Holistic (pose + face mesh + hands)
+# hands: MediaPipe Hands only, mapped onto the same left/right slots
+LANDMARK_DETECTOR = os.environ.get('LANDMARK_DETECTOR', 'holistic')
+# MediaPipe Hands labels handedness assuming a mirrored (selfie) image. Our
+# frames are not mirrored, so its "Left" is the signer's right hand.
+HANDS_MIRRORED_INPUT = os.environ.get('HANDS_MIRRORED_INPUT', '0') == '1'
+
+_mediapipe = None
+_mediapipe_lock = threading.Lock()
+
+
+# === MediaPipe, imported on first use ===
+# mediapipe's tasks package imports TensorFlow whenever it is installed, only
+# to borrow a docs decorator, which adds seconds to start-up. If TensorFlow is
+# not loaded yet, stand-in modules satisfy that one import and are removed
+# again, so a later `import tensorflow` still gets the real package. The lock
+# keeps threads from installing or removing the stand-ins under each other; a
+# thread importing TensorFlow itself should call this first (see app.py).
+def mediapipe():
+    global _mediapipe
+    if _mediapipe is not None:
+        return _mediapipe
+    with _mediapipe_lock:
+        if _mediapipe is not None:
+            return _mediapipe
+        if 'tensorflow' in sys.modules:
+            import mediapipe as mp
+        else:
+            names = ('tensorflow', 'tensorflow.tools', 'tensorflow.tools.docs')
+            stand_ins = {name: types.ModuleType(name) for name in names}
+            stand_ins['tensorflow.tools.docs'].doc_controls = types.SimpleNamespace(do_not_generate_docs=lambda obj: obj)
+            sys.modules.update(stand_ins)
+            try:
+                import mediapipe as mp
+            finally:
+                for name in names:
+                    if sys.modules.get(name) is stand_ins[name]:
+                        del sys.modules[name]
+        _mediapipe = mp
+    return mp
+
+
+def _pick(kwargs, allowed):
+    return {key: value for key, value in kwargs.items() if key in allowed}
+
+
+# === Common close / context-manager handling ===
+class _Detector:
+    def close(self):
+        self._graph.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# === Full Holistic graph ===
+class HolisticDetector(_Detector):
+    name = 'holistic'
+
+    def __init__(self, **kwargs):
+        self._graph = mediapipe().solutions.holistic.Holistic(**_pick(kwargs, (
+            'static_image_mode', 'model_complexity', 'smooth_landmarks', 'enable_segmentation',
+            'smooth_segmentation', 'refine_face_landmarks', 'min_detection_confidence', 'min_tracking_confidence',
+        )))
+
+    def process(self, image):
+        return self._graph.process(image)
+
+
+# === Same left/right hand attributes as Holistic results ===
+class HandResults:
+    def __init__(self, left_hand_landmarks=None, right_hand_landmarks=None):
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
+
+# === Hands-only graph: skips pose and face mesh ===
+class HandsDetector(_Detector):
+    name = 'hands'
+
+    def __init__(self, mirrored_input=HANDS_MIRRORED_INPUT, **kwargs):
+        kwargs.setdefault('max_num_hands', 2)
+        # Hands only offers complexity 0 and 1
+        if 'model_complexity' in kwargs:
+            kwargs['model_complexity'] = min(kwargs['model_complexity'], 1)
+        self._graph = mediapipe().solutions.hands.Hands(**_pick(kwargs, (
+            'static_image_mode', 'max_num_hands', 'model_complexity',
+            'min_detection_confidence', 'min_tracking_confidence',
+        )))
+        self._left_label = 'Left' if mirrored_input else 'Right'
+
+    def process(self, image):
+        raw = self._graph.process(image)
+        results = HandResults()
+        if not raw.multi_hand_landmarks:
+            return results
+
+        # Keep the most confident hand per side if both detections got one label
+        scores = {}
+        for landmarks, handedness in zip(raw.multi_hand_landmarks, raw.multi_handedness):
+            label = handedness.classification[0]
+            slot = 'left_hand_landmarks' if label.label == self._left_label else 'right_hand_landmarks'
+            if label.score > scores.get(slot, -1.0):
+                scores[slot] = label.score
+                setattr(results, slot, landmarks)
+        return results
+
+
+DETECTORS = {
+    HolisticDetector.name: HolisticDetector,
+    HandsDetector.name: HandsDetector,
+}
+
+
+def create_detector(backend=LANDMARK_DETECTOR, **kwargs):
+    if backend not in DETECTORS:
+        raise ValueError(f"Unknown landmark detector '{backend}' (choose from {', '.join(DETECTORS)})")
+    return DETECTORS[backend](**kwargs)
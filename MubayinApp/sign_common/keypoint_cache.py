@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from sign_common.keypoints import FEATURES
+
+# === Cache configuration ===
+# In-process LRU size; 0 disables the cache
+KEYPOINT_CACHE_MB = float(os.environ.get('KEYPOINT_CACHE_MB', 64))
+# Optional directory shared by every worker process (e.g. on tmpfs)
+KEYPOINT_CACHE_DIR = os.environ.get('KEYPOINT_CACHE_DIR', '')
+KEYPOINT_CACHE_DISK_MB = float(os.environ.get('KEYPOINT_CACHE_DISK_MB', 512))
+
+ENTRY_BYTES = FEATURES * 4  # one float32 (126,) vector
+# Rough per-entry cost of the dict slot, key and bytes object
+ENTRY_OVERHEAD = 200
+# Check the disk tier's size every this many writes
+DISK_PRUNE_EVERY = 1024
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+# === Keypoint vectors keyed by a hash of the encoded frame ===
+# The namespace keeps results from different detectors or preprocessing apart,
+# since the same bytes give different keypoints under each.
+class KeypointCache:
+    def __init__(self, namespace, max_mb=KEYPOINT_CACHE_MB,
+                 disk_dir=KEYPOINT_CACHE_DIR, disk_max_mb=KEYPOINT_CACHE_DISK_MB):
+        self.namespace = namespace.encode()
+        self.max_entries = int(max_mb * 1024 * 1024 // (ENTRY_BYTES + ENTRY_OVERHEAD))
+        self.disk_dir = os.path.join(disk_dir, namespace) if disk_dir else ''
+        self.disk_max_entries = int(disk_max_mb * 1024 * 1024 // ENTRY_BYTES)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._disk_writes = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 or bool(self.disk_dir)
+
+    def key(self, data):
+        if xxhash is not None:
+            return xxhash.xxh3_128_digest(self.namespace + b'\0' + data)
+        return hashlib.blake2b(data, digest_size=16, key=self.namespace[:64]).digest()
+
+    def get(self, key, out):
+        # Fills `out` and returns it on a hit, otherwise returns None
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        if value is None and self.disk_dir:
+            value = self._disk_get(key)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self._disk_hits += 1
+        if value is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        out[:] = np.frombuffer(value, dtype=np.float32)
+        return out
+
+    def put(self, key, keypoints):
+        if not self.enabled:
+            return
+        value = np.ascontiguousarray(keypoints, dtype=np.float32).tobytes()
+        self._remember(key, value)
+        if self.disk_dir:
+            self._disk_put(key, value)
+
+    def _remember(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # === On-disk tier: one small file per entry, shared across processes ===
+    def _disk_path(self, key):
+        name = key.hex()
+        return os.path.join(self.disk_dir, name[:2], name)
+
+    def _disk_get(self, key):
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                value = f.read()
+        except OSError:
+            return None
+        return value if len(value) == ENTRY_BYTES else None
+
+    def _disk_put(self, key, value):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)  # atomic, so readers never see a partial file
+        except OSError as e:
+            print("Error writing keypoint cache entry:", e)
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % DISK_PRUNE_EVERY == 0
+        if prune:
+            self._disk_prune()
+
+    def _disk_prune(self):
+        # Drop the least recently written entries once over the size bound
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        excess = len(entries) - self.disk_max_entries
+        if excess <= 0:
+            return
+        for _, path in sorted(entries)[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits + self._disk_hits) / lookups if lookups else 0.0,
+                'disk_dir': self.disk_dir or None,
+            }
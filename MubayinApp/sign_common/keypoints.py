@@ -0,0 +1,47 @@
+import itertools
+import operator
+
+import numpy as np
+
+# === Hand keypoint layout (126 total: 63 for each hand) ===
+# [left hand x, y, z * 21 landmarks, right hand x, y, z * 21 landmarks]
+HAND_LANDMARKS = 21
+HAND_FEATURES = HAND_LANDMARKS * 3
+FEATURES = HAND_FEATURES * 2
+
+
+# === Preallocated (frames, 126) float32 buffer for a request or session ===
+def new_buffer(frames):
+    return np.zeros((frames, FEATURES), dtype=np.float32)
+
+
+# Reads one landmark's (x, y, z) in a single call
+_XYZ = operator.attrgetter('x', 'y', 'z')
+
+
+# === Copy one hand's landmarks into a (63,) slice, zero-filling if missing ===
+def _write_hand(hand_landmarks, out):
+    if hand_landmarks is None:
+        out.fill(0.0)
+    else:
+        # Streams x, y, z straight off the landmarks: no per-landmark tuples list
+        out[:] = np.fromiter(itertools.chain.from_iterable(map(_XYZ, hand_landmarks.landmark)),
+                             dtype=np.float32, count=HAND_FEATURES)
+
+
+# === Only extract hand keypoints, writing into `out` when given ===
+def extract_keypoints(results, out=None):
+    if out is None:
+        out = np.empty(FEATURES, dtype=np.float32)
+    if results.left_hand_landmarks is None and results.right_hand_landmarks is None:
+        # Most frames between signs: one fill, no per-hand slicing
+        out.fill(0.0)
+        return out
+    _write_hand(results.left_hand_landmarks, out[:HAND_FEATURES])
+    _write_hand(results.right_hand_landmarks, out[HAND_FEATURES:])
+    return out
+
+
+# === True when neither hand was detected ===
+def no_hands(keypoints):
+    return not keypoints.any()
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from sign_common.keypoints import no_hands
+
+# === Prometheus-style metrics shared by ASL_model and HandModel-backend ===
+# Plain counters and fixed-bucket histograms behind a lock, rendered in the
+# Prometheus text format on GET /metrics. Recording costs a dict lookup and a
+# bisect, so it stays on in production. Under gunicorn every worker keeps its
+# own numbers; scrape each worker, or sum across them, to see the whole server.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from a cached-hit lookup up to a slow remote model call
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0)
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}' for key, value in items]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            # Buckets are stored per interval and reported cumulatively
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {repr(series[-1])}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}')
+        return lines
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self):
+        value = self.read()
+        return [] if value is None else [f'{self.name} {_format_value(value)}']
+
+
+# === Process memory ===
+def resident_memory_bytes():
+    # Current RSS from /proc on Linux, otherwise the peak from getrusage
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+# === The shared metric names ===
+# stage: decode, color, mediapipe_detection, extract_keypoints, classify,
+# model, overlay, file_io
+stage_seconds = Histogram('sign_stage_seconds', 'Time spent in each processing stage.',
+                          STAGE_BUCKETS, labels=('stage',))
+# outcome: ok, bad_request, rejected (429), busy (503), error (other 5xx)
+requests_total = Counter('sign_requests_total', 'HTTP requests by route and outcome.',
+                         labels=('route', 'outcome'))
+frames_total = Counter('sign_frames_total', 'Frames run through landmark detection.')
+no_hands_total = Counter('sign_frames_no_hands_total', 'Frames in which no hand was detected.')
+prediction_confidence = Histogram('sign_prediction_confidence', 'Top-class probability of each prediction.',
+                                  CONFIDENCE_BUCKETS)
+resident_memory = Gauge('process_resident_memory_bytes', 'Resident memory size in bytes.',
+                        resident_memory_bytes)
+
+REGISTRY = [stage_seconds, requests_total, frames_total, no_hands_total, prediction_confidence, resident_memory]
+
+
+def outcome_for_status(status):
+    if status < 400:
+        return 'ok'
+    if status == 429:
+        return 'rejected'
+    if status == 503:
+        return 'busy'
+    return 'bad_request' if status < 500 else 'error'
+
+
+def record_request(route, status):
+    requests_total.inc(route=route, outcome=outcome_for_status(status))
+
+
+def record_frame(keypoints):
+    frames_total.inc()
+    if no_hands(keypoints):
+        no_hands_total.inc()
+
+
+def render(registry=REGISTRY):
+    lines = []
+    for metric in registry:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,104 @@
+import itertools
+import os
+import queue
+import threading
+
+import cv2
+
+from sign_common.detectors import mediapipe
+from sign_common.metrics import stage_seconds
+
+# === Debug overlay configuration (off unless OVERLAY_ENABLED=1) ===
+OVERLAY_ENABLED = os.environ.get('OVERLAY_ENABLED', '0') == '1'
+# Render the frames of 1 in N requests; a sampled request gets all its frames
+OVERLAY_SAMPLE_EVERY = int(os.environ.get('OVERLAY_SAMPLE_EVERY', 1))
+# Frames waiting to be drawn; further frames are dropped rather than queued
+OVERLAY_QUEUE_DEPTH = int(os.environ.get('OVERLAY_QUEUE_DEPTH', 32))
+OVERLAY_WORKERS = int(os.environ.get('OVERLAY_WORKERS', 1))
+
+
+# === Draw the detected hands onto a frame and write it as a JPEG ===
+def render_overlay(image, results, path):
+    solutions = mediapipe().solutions
+    for landmarks in (results.left_hand_landmarks, results.right_hand_landmarks):
+        if landmarks:
+            solutions.drawing_utils.draw_landmarks(image, landmarks, solutions.hands.HAND_CONNECTIONS)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    cv2.imwrite(path, image)
+
+
+# === Sampled landmark overlays rendered off the request thread ===
+# sample() is called once per request and decides for all of its frames,
+# so a sampled sequence is never missing some of its overlays. The caller
+# must not modify `image` after handing it over.
+class OverlayWriter:
+    def __init__(self, enabled=OVERLAY_ENABLED, sample_every=OVERLAY_SAMPLE_EVERY,
+                 queue_depth=OVERLAY_QUEUE_DEPTH, workers=OVERLAY_WORKERS):
+        self.enabled = enabled
+        self.sample_every = max(1, sample_every)
+        self._counter = itertools.count()
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._workers = max(1, workers)
+        self._worker_pid = None
+
+    def _ensure_workers(self):
+        # Started on first use so a gunicorn worker gets its own threads
+        # rather than inheriting dead ones from the master
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                for index in range(self._workers):
+                    threading.Thread(target=self._run, name=f'overlay-writer-{index}', daemon=True).start()
+                self._worker_pid = os.getpid()
+
+    def sample(self, frames=1):
+        if not self.enabled or next(self._counter) % self.sample_every:
+            return False
+        # Skip the whole request rather than keep part of it when the queue is nearly full
+        if self._queue.maxsize and self._queue.qsize() + frames > self._queue.maxsize:
+            with self._lock:
+                self._dropped += frames
+            return False
+        return True
+
+    def submit(self, image, results, path):
+        # Frames of a request that sample() picked; unsampled requests never get here
+        if not self.enabled:
+            return False
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((image, results, path))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            image, results, path = self._queue.get()
+            try:
+                with stage_seconds.time(stage='overlay'):
+                    render_overlay(image, results, path)
+                with self._lock:
+                    self._written += 1
+            except Exception as e:
+                print("Error writing overlay:", e)
+                with self._lock:
+                    self._failed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sample_every': self.sample_every,
+                'queued': self._queue.qsize(),
+                'written': self._written,
+                'dropped': self._dropped,
+                'failed': self._failed,
+            }
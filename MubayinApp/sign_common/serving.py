@@ -0,0 +1,9 @@
+import os
+
+# === Pre-fork serving (see gunicorn.conf.py in each service) ===
+# The gunicorn configs set SIGN_PREFORK=1 before the app is imported in the
+# master process. Threads and MediaPipe graphs do not survive fork(), so the
+# components that own them build them in each worker instead; plain NumPy
+# weights and lookup tables stay loaded in the master and are shared
+# copy-on-write.
+PREFORK = os.environ.get('SIGN_PREFORK', '0') == '1'